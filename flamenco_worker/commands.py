@@ -152,6 +152,9 @@ class AbstractCommand(metaclass=abc.ABCMeta):
     # Mapping from 'thing' name to how long it took to do that 'thing' (in seconds).
     timing: Timing = attr.ib(init=False, factory=Timing)
 
+    # Log lines that are sent to the Worker in one go when the command finishes.
+    _pending_log_lines: typing.List[str] = attr.ib(init=False, factory=list)
+
     def __attrs_post_init__(self):
         self.identifier = '%s.(task_id=%s, command_idx=%s)' % (
             self.command_name,
@@ -201,6 +204,7 @@ class AbstractCommand(metaclass=abc.ABCMeta):
                     await self._register_exception(ex)
                     return False
         finally:
+            await self.flush_pending_log_lines()
             await self.log_recorded_timings()
 
         await self.worker.register_log('%s: Finished' % self.command_name)
@@ -221,6 +225,24 @@ class AbstractCommand(metaclass=abc.ABCMeta):
         self._log.log(level, msg)
         await self.worker.register_log(f'{self.command_name}: {msg}')
 
+    def queue_log(self, log_entry: str, *fmt_args) -> None:
+        """Queue a log entry for the task log, to be sent when the command finishes.
+
+        Use this instead of worker.register_log() for many small log entries.
+        """
+        if fmt_args:
+            log_entry %= fmt_args
+        self._pending_log_lines.append(log_entry)
+
+    async def flush_pending_log_lines(self) -> None:
+        """Send the log entries queued with queue_log() to the Worker."""
+        if not self._pending_log_lines:
+            return
+
+        log_entry = '\n'.join(self._pending_log_lines)
+        self._pending_log_lines.clear()
+        await self.worker.register_log(log_entry)
+
     async def log_recorded_timings(self) -> None:
         """Send the timing recorded in self._timing to the task log."""
         if not self.timing:
@@ -240,6 +262,8 @@ class AbstractCommand(metaclass=abc.ABCMeta):
     async def _register_exception(self, ex: Exception):
         """Registers an exception with the worker, and set the task status to 'failed'."""
 
+        # Whatever was queued happened before the error, so keep the task log in order.
+        await self.flush_pending_log_lines()
         await self.worker.register_log('%s: Error executing: %s' % (self.identifier, ex))
         await self.worker.register_task_update(
             activity='%s: Error executing: %s' % (self.identifier, ex),
@@ -344,13 +368,13 @@ class SleepCommand(AbstractCommand):
 
     async def execute(self, settings: Settings):
         time_in_seconds = settings['time_in_seconds']
-        start_time = time.time()
+        start_time = time.monotonic()
         await self.worker.register_log('Sleeping for %s seconds' % time_in_seconds)
 
         # Make sure we don't sleep any less than required (can happen on Windows
         # with a single asyncio.sleep() call).
         while True:
-            time_left = time_in_seconds - (time.time() - start_time)
+            time_left = time_in_seconds - (time.monotonic() - start_time)
             if time_left < 0.05:
                 break
             await asyncio.sleep(time_left)
@@ -742,8 +766,7 @@ class AbstractSubprocessCommand(AbstractCommand, abc.ABC):
 
         timeout = 5
         try:
-            retval = await asyncio.wait_for(self.proc.wait(), timeout,
-                                            loop=asyncio.get_event_loop())
+            retval = await asyncio.wait_for(self.proc.wait(), timeout)
         except asyncio.TimeoutError:
             pass
         else:
@@ -804,12 +827,15 @@ class ExecCommand(AbstractSubprocessCommand):
 
 
 class AbstractBlenderCommand(AbstractSubprocessCommand):
-    re_global_progress = attr.ib(init=False)
-    re_time = attr.ib(init=False)
-    re_remaining = attr.ib(init=False)
-    re_status = attr.ib(init=False)
-    re_path_not_found = attr.ib(init=False)
-    re_file_saved = attr.ib(init=False)
+    re_global_progress = re.compile(
+        r"^Fra:(?P<fra>\d+) Mem:(?P<mem>[^ ]+) \(.*?, Peak (?P<peakmem>[^ ]+)\)")
+    re_time = re.compile(
+        r'\| Time:((?P<hours>\d+):)?(?P<minutes>\d+):(?P<seconds>\d+)\.(?P<hunds>\d+) ')
+    re_remaining = re.compile(
+        r'\| Remaining:((?P<hours>\d+):)?(?P<minutes>\d+):(?P<seconds>\d+)\.(?P<hunds>\d+) ')
+    re_status = re.compile(r'\| (?P<status>[^\|]+)\s*$')
+    re_path_not_found = re.compile(r"Warning: Path '.*' not found")
+    re_file_saved = re.compile(r"Saved: '(?P<filename>.*)'")
     _last_activity_time: float = 0.0
 
     _TIMING_STARTING_BLENDER = 'starting blender'
@@ -818,18 +844,6 @@ class AbstractBlenderCommand(AbstractSubprocessCommand):
 
     def __attrs_post_init__(self):
         super().__attrs_post_init__()
-
-        # Delay regexp compilation until a BlenderRenderCommand is actually constructed.
-        self.re_global_progress = re.compile(
-            r"^Fra:(?P<fra>\d+) Mem:(?P<mem>[^ ]+) \(.*?, Peak (?P<peakmem>[^ ]+)\)")
-        self.re_time = re.compile(
-            r'\| Time:((?P<hours>\d+):)?(?P<minutes>\d+):(?P<seconds>\d+)\.(?P<hunds>\d+) ')
-        self.re_remaining = re.compile(
-            r'\| Remaining:((?P<hours>\d+):)?(?P<minutes>\d+):(?P<seconds>\d+)\.(?P<hunds>\d+) ')
-        self.re_status = re.compile(r'\| (?P<status>[^\|]+)\s*$')
-        self.re_path_not_found = re.compile(r"Warning: Path '.*' not found")
-        self.re_file_saved = re.compile(r"Saved: '(?P<filename>.*)'")
-
         self._last_activity_time = 0.0
 
     def _format_dna_to_cli(self, format_for_dna: str) -> str:
@@ -1162,7 +1176,7 @@ class MergeProgressiveRendersCommand(AbstractSubprocessCommand):
         assert not dst.exists() or dst.is_file()
         assert dst.exists() or dst.parent.exists()
 
-        await self.worker.register_log('Moving %s to %s', src, dst)
+        self.queue_log('Moving %s to %s', src, dst)
         shutil.move(str(src), str(dst))
 
 
@@ -92,21 +92,22 @@ def load_config(config_file: pathlib.Path = None,
     confparser = ConfigParser()
     confparser.read_dict(DEFAULT_CONFIG)
 
+    # ConfigParser.read() skips files it cannot open, and returns the names of
+    # the files it did load. This doubles as the existence check.
     if config_file:
         log.info('Loading configuration from %s', config_file)
-        if not config_file.exists():
+        loaded = confparser.read(str(config_file), encoding='utf8')
+        if not loaded:
             log.error('Config file %s does not exist', config_file)
             raise SystemExit(47)
-        loaded = confparser.read(str(config_file), encoding='utf8')
     else:
-        if not GLOBAL_CONFIG_FILE.exists():
-            log.error('Config file %s does not exist', GLOBAL_CONFIG_FILE)
-            raise SystemExit(47)
-
-        config_files = [GLOBAL_CONFIG_FILE, HOME_CONFIG_FILE]
-        filenames = [str(f.absolute()) for f in config_files]
+        global_config = str(GLOBAL_CONFIG_FILE)
+        filenames = [global_config, str(HOME_CONFIG_FILE)]
         log.info('Loading configuration from %s', ', '.join(filenames))
         loaded = confparser.read(filenames, encoding='utf8')
+        if global_config not in loaded:
+            log.error('Config file %s does not exist', GLOBAL_CONFIG_FILE)
+            raise SystemExit(47)
 
     log.info('Succesfully loaded: %s', loaded)
 
@@ -1,9 +1,11 @@
 """Classes for JSON documents used in upstream communication."""
 
+import typing
+
 import attr
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class Activity:
     """Activity on a task."""
 
@@ -11,25 +13,36 @@ class Activity:
     current_command_idx: int = 0
     task_progress_percentage: int = 0
     command_progress_percentage: int = 0
-    metrics: dict = {}
+    # Not sent to the Manager when None.
+    metrics: typing.Optional[dict] = None
+
 
+# The response documents below are only type-checked in __debug__ mode, as
+# they are constructed for every response from the Manager.
 
-@attr.s
+@attr.s(slots=True, frozen=True)
 class MayKeepRunningResponse:
     """Response from the /may-i-run/{task-id} endpoint"""
 
-    may_keep_running = attr.ib(
-        validator=attr.validators.instance_of(bool))
-    reason = attr.ib(
-        default=None,
-        validator=attr.validators.optional(attr.validators.instance_of(str)))
-    status_requested = attr.ib(
-        default=None,
-        validator=attr.validators.optional(attr.validators.instance_of(str)))
+    may_keep_running = attr.ib()  # type: bool
+    reason = attr.ib(default=None)  # type: typing.Optional[str]
+    status_requested = attr.ib(default=None)  # type: typing.Optional[str]
 
+    def __attrs_post_init__(self):
+        assert isinstance(self.may_keep_running, bool), \
+            f'may_keep_running should be bool, not {self.may_keep_running!r}'
+        assert self.reason is None or isinstance(self.reason, str), \
+            f'reason should be str or None, not {self.reason!r}'
+        assert self.status_requested is None or isinstance(self.status_requested, str), \
+            f'status_requested should be str or None, not {self.status_requested!r}'
 
-@attr.s
+
+@attr.s(slots=True, frozen=True)
 class StatusChangeRequest:
     """Response from the /task endpoint when we're requested to change our status"""
 
-    status_requested = attr.ib(validator=attr.validators.instance_of(str))
+    status_requested = attr.ib()  # type: str
+
+    def __attrs_post_init__(self):
+        assert isinstance(self.status_requested, str), \
+            f'status_requested should be str, not {self.status_requested!r}'
@@ -1,10 +1,19 @@
 import json
+import typing
 
 from . import timing
 
+# Mapping from type to a function that converts instances of that type to
+# something JSON-compatible. Lookup is by exact type, so subclasses need
+# their own entry.
+_ENCODERS = {
+    timing.Timing: timing.Timing.to_json_compat,
+}  # type: typing.Dict[type, typing.Callable[[typing.Any], typing.Any]]
+
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
-        if isinstance(o, timing.Timing):
-            return o.to_json_compat()
+        encoder = _ENCODERS.get(type(o))
+        if encoder is not None:
+            return encoder(o)
         return super().default(o)
@@ -1,23 +1,33 @@
 """JWT token creation for Worker registration."""
 
+import base64
 import datetime
-
-import jwt
+import hashlib
+import hmac
 
 from . import tz
 
 REGISTRATION_TOKEN_EXPIRY = datetime.timedelta(minutes=15)
 
 
+def _b64url(data: bytes) -> bytes:
+    """Unpadded URL-safe base64 encoding, as required by RFC 7515."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+# The header never changes, so it only has to be encoded once.
+_HEADER_B64 = _b64url(b'{"typ":"JWT","alg":"HS256"}')
+
+
 def new_registration_token(pre_shared_secret: str) -> str:
     """Return a new JWT signed with the pre-shared secret."""
 
     now = datetime.datetime.now(tz.tzutc())
     expiry = now + REGISTRATION_TOKEN_EXPIRY
 
-    claims = {
-        'exp': expiry.timestamp(),
-        'iat': now.timestamp(),
-    }
-    token = jwt.encode(claims, pre_shared_secret.encode(), algorithm='HS256')
+    claims = f'{{"exp":{expiry.timestamp()!r},"iat":{now.timestamp()!r}}}'
+    signing_input = _HEADER_B64 + b'.' + _b64url(claims.encode('ascii'))
+    signature = hmac.new(pre_shared_secret.encode(), signing_input, hashlib.sha256).digest()
+
+    token = signing_input + b'.' + _b64url(signature)
     return token.decode('ascii')
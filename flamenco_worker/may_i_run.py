@@ -60,7 +60,7 @@ class MayIRun:
         """
 
         try:
-            resp = await self.manager.get('/may-i-run/%s' % task_id, loop=self.loop)
+            resp = await self.manager.get('/may-i-run/%s' % task_id)
         except Exception as ex:
             self._log.warning('Unable to query may-i-run endpoint: %s', ex)
             return None
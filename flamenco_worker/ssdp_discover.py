@@ -1,7 +1,10 @@
+import functools
 import logging
 import platform
+import select
 import socket
-from http.client import HTTPResponse
+import time
+import typing
 
 DISCOVERY_MSG = (b'M-SEARCH * HTTP/1.1\r\n' +
                  b'ST: urn:flamenco:manager:0\r\n' +
@@ -9,100 +12,195 @@ DISCOVERY_MSG = (b'M-SEARCH * HTTP/1.1\r\n' +
                  b'MAN: "ssdp:discover"\r\n' +
                  b'HOST: 239.255.255.250:1900\r\n\r\n')
 
-# We use site-local multicast, both in IPv6 and IPv4.
+# Sending the message more than once will decrease the probability of a timeout.
+DISCOVERY_BATCH = (DISCOVERY_MSG,) * 2
+
+# Large enough for a single UDP datagram on a typical Ethernet MTU.
+RECV_BUFFER_SIZE = 1500
+
+SSDP_PORT = 1900
+
+# We use site-local multicast, both in IPv6 and IPv4. For IPv4 we also send a
+# limited broadcast, for networks that filter out multicast traffic.
 DESTINATIONS = {
-    socket.AF_INET6: 'FF05::C',
-    socket.AF_INET: '239.255.255.250',
-}
+    socket.AF_INET6: ('FF05::C',),
+    socket.AF_INET: ('239.255.255.250', '255.255.255.255'),
+}  # type: typing.Mapping[int, typing.Tuple[str, ...]]
+
+# How long the result of interface_addresses() is cached, in seconds.
+INTERFACE_CACHE_TTL = 60.0
 
 log = logging.getLogger(__name__)
 
+# (time.monotonic() timestamp, address families) of the last interface_addresses() call.
+_interface_cache = (0.0, ())  # type: typing.Tuple[float, typing.Tuple[int, ...]]
+
 
 class DiscoveryFailed(Exception):
     """Raised when we cannot find a Manager through SSDP."""
 
 
-class Response(HTTPResponse):
-    # noinspection PyMissingConstructor
-    def __init__(self, payload: bytes):
-        from io import BytesIO
+def _parse_location(payload: bytes) -> typing.Optional[str]:
+    """Returns the Location header of an SSDP response, or None if there is none."""
+
+    # Header names are case-insensitive. The first line is the status line,
+    # so the header is always preceded by a newline.
+    start = payload.lower().find(b'\nlocation:')
+    if start < 0:
+        return None
+    start += len(b'\nlocation:')
 
-        self.fp = BytesIO(payload)
-        self.debuglevel = 0
-        self.strict = 0
+    end = payload.find(b'\n', start)
+    if end < 0:
+        end = len(payload)
+    # HTTP header values are ISO-8859-1; decoding that never fails, so a response with
+    # stray non-ASCII bytes can't abort the discovery.
+    return payload[start:end].strip().decode('latin-1')
 
-        # This is also done in the HTTPResponse __init__ function, but
-        # MyPy still doesn't like it.
-        self.headers = self.msg = None  # type: ignore
 
-        self._method = None
+@functools.lru_cache(maxsize=1)
+def _probe_addresses() -> typing.Tuple[str, ...]:
+    """Returns the wildcard addresses of the usable address families.
 
-        self.begin()
+    Skips IPv6 when it is not supported or disabled on this host.
+    """
+    if not socket.has_ipv6:
+        return ('0.0.0.0',)
+    try:
+        socket.socket(socket.AF_INET6, socket.SOCK_DGRAM).close()
+    except OSError:
+        log.debug('IPv6 is not available, only using IPv4 for discovery')
+        return ('0.0.0.0',)
+    return ('0.0.0.0', '::')
 
 
 def interface_addresses():
-    for dest in ('0.0.0.0', '::'):
+    for dest in _probe_addresses():
         for family, _, _, _, _ in socket.getaddrinfo(dest, None):
             yield family
 
 
-def find_flamenco_manager(timeout=1, retries=5):
-    log.info('Finding Flamenco Manager through UPnP/SSDP discovery.')
+def cached_interface_families(ttl: float = INTERFACE_CACHE_TTL) -> typing.Tuple[int, ...]:
+    """Returns the address families of interface_addresses(), cached for 'ttl' seconds."""
 
-    families_and_addresses = set(interface_addresses())
-    is_windows = platform.system() == 'Windows'
+    global _interface_cache
 
-    for _ in range(retries):
-        failed_families = 0
+    cached_at, families = _interface_cache
+    now = time.monotonic()
+    if not families or now - cached_at >= ttl:
+        # Deduplicate while keeping the order in which getaddrinfo() returned them.
+        families = tuple(dict.fromkeys(interface_addresses()))
+        _interface_cache = (now, families)
+    return families
 
-        for family in families_and_addresses:
-            try:
-                dest = DESTINATIONS[family]
-            except KeyError:
-                log.warning('Unknown address family %s, skipping', family)
-                continue
 
-            log.debug('Sending to %s, dest=%s', family, dest)
+def _discovery_socket(family: int, is_windows: bool) -> socket.socket:
+    """Creates a non-blocking UDP socket for sending & receiving SSDP messages."""
 
-            sock = socket.socket(family, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-            sock.settimeout(timeout)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            if hasattr(socket, 'SO_REUSEPORT'):  # on macOS
-                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
-            try:
-                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
-            except OSError:
-                # Not supported on Windows and AF_INET6.
-                pass
+    sock = socket.socket(family, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):  # on macOS
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
+        except OSError:
+            # Not supported on Windows and AF_INET6.
+            pass
 
-            sock.bind(('', 1901))
+        sock.bind(('', 1901))
+
+        if family == socket.AF_INET:
+            # Required for sending to the broadcast address.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
             # Required on Windows, otherwise the message won't go out.
-            if is_windows and family == socket.AF_INET:
-                sock.setsockopt(socket.SOL_IP, socket.IP_MULTICAST_IF, socket.inet_aton('0.0.0.0'))
+            if is_windows:
+                sock.setsockopt(socket.SOL_IP, socket.IP_MULTICAST_IF,
+                                socket.inet_aton('0.0.0.0'))
+    except Exception:
+        # Don't leak the file descriptor when the socket cannot be set up.
+        sock.close()
+        raise
+
+    return sock
 
+
+def _first_response(readable: typing.Iterable[socket.socket],
+                    recv_buffer: bytearray) -> typing.Optional[str]:
+    """Returns the Location of the first valid response read from the readable sockets.
+
+    Responses without a Location header are skipped. Returns None if none of
+    the queued responses has one.
+    """
+
+    for sock in readable:
+        while True:
             try:
-                for _ in range(2):
-                    # sending it more than once will
-                    # decrease the probability of a timeout
-                    sock.sendto(DISCOVERY_MSG, (dest, 1900))
-            except (PermissionError, OSError):
-                log.info('Failed sending UPnP/SSDP discovery message to %s, dest=%s', family, dest)
-                failed_families += 1
+                num_bytes, _ = sock.recvfrom_into(recv_buffer, RECV_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            location = _parse_location(bytes(recv_buffer[:num_bytes]))
+            if location is None:
+                log.warning('Ignoring SSDP response without Location header')
                 continue
+            return location
 
+    return None
+
+
+def find_flamenco_manager(timeout=1, retries=5):
+    log.info('Finding Flamenco Manager through UPnP/SSDP discovery.')
+
+    is_windows = platform.system() == 'Windows'
+
+    # Reused for every response, so that retrying doesn't allocate new buffers.
+    recv_buffer = bytearray(RECV_BUFFER_SIZE)
+
+    # Create one socket per address family, and keep them around for all retries.
+    # All sockets are probed at the same time, so that a retry takes at most
+    # 'timeout' seconds regardless of the number of address families.
+    # Mapping from socket to the (address, port) tuples to send to.
+    socks = {}  # type: typing.Dict[socket.socket, typing.List[typing.Tuple[str, int]]]
+    try:
+        for family in cached_interface_families():
             try:
-                data = sock.recv(1024)
-            except socket.timeout:
-                pass
-            else:
-                response = Response(data)
-                return response.getheader('Location')
-
-        if failed_families >= len(families_and_addresses):
-            log.error('Failed to send UPnP/SSDP discovery message '
-                      'to every address family (IPv4/IPv6)')
-            break
+                dests = DESTINATIONS[family]
+            except KeyError:
+                log.warning('Unknown address family %s, skipping', family)
+                continue
+            sock = _discovery_socket(family, is_windows)
+            socks[sock] = [(dest, SSDP_PORT) for dest in dests]
+
+        for _ in range(retries):
+            sent_to = []
+            for sock, dests in socks.items():
+                for dest_addr in dests:
+                    log.debug('Sending to %s, dest=%s', sock.family, dest_addr[0])
+                    try:
+                        for message in DISCOVERY_BATCH:
+                            sock.sendto(message, dest_addr)
+                    except (PermissionError, OSError):
+                        log.info('Failed sending UPnP/SSDP discovery message to %s, dest=%s',
+                                 sock.family, dest_addr[0])
+                        continue
+                    if sock not in sent_to:
+                        sent_to.append(sock)
+
+            if not sent_to:
+                log.error('Failed to send UPnP/SSDP discovery message '
+                          'to every address family (IPv4/IPv6)')
+                break
+
+            readable, _, _ = select.select(sent_to, [], [], timeout)
+            location = _first_response(readable, recv_buffer)
+            if location is not None:
+                return location
+    finally:
+        for sock in socks:
+            sock.close()
 
     raise DiscoveryFailed('Unable to find Flamenco Manager after %i tries' % retries)
 
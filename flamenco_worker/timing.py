@@ -1,7 +1,5 @@
 """For keeping track of timing information."""
 
-import collections
-import contextlib
 import dataclasses
 import datetime
 import time
@@ -10,29 +8,24 @@ import typing
 
 @dataclasses.dataclass
 class Timing:
-    """Registers intervals by name and duration (in seconds)."""
+    """Registers intervals by name and duration (in seconds).
 
-    events: typing.Dict[str, float] = dataclasses.field(
-        default_factory=collections.OrderedDict)
+    Instances are not thread-safe. Every command gets its own instance, and
+    the task runner merges them with += on the asyncio loop thread.
+    """
+
+    # Plain dicts keep insertion order, so the events stay in chronological order.
+    events: typing.Dict[str, float] = dataclasses.field(default_factory=dict)
 
     _last_name = ''
-    _last_checkpoint = 0.0
+    _last_checkpoint_ns = 0  # timestamp from time.monotonic_ns()
 
     def clear(self) -> None:
         self.events.clear()
 
-    @contextlib.contextmanager
-    def record_duration(self, name: str):
+    def record_duration(self, name: str) -> '_RecordDuration':
         """Records the duration of the context under the given name."""
-
-        start_time = time.monotonic()
-        try:
-            yield
-        finally:
-            duration = time.monotonic() - start_time
-            assert name not in self.events, \
-                f'{name} not expected in {self.events}'
-            self.events[name] = duration
+        return _RecordDuration(self, name)
 
     def checkpoint(self, name: str):
         """Registers a checkpoint for the interval with the given name.
@@ -42,16 +35,16 @@ class Timing:
 
         Always end the last interval with a call to checkpoint('').
         """
-        now = time.monotonic()
+        now_ns = time.monotonic_ns()
 
         if self._last_name:
-            duration = now - self._last_checkpoint
-            assert self._last_name not in self.events, \
-                f'{self._last_name} not expected in {self.events}'
+            duration = (now_ns - self._last_checkpoint_ns) / 1e9
+            if __debug__ and self._last_name in self.events:
+                raise ValueError(f'{self._last_name} not expected in {self.events}')
             self.events[self._last_name] = duration
 
         self._last_name = name
-        self._last_checkpoint = now
+        self._last_checkpoint_ns = now_ns
 
     @property
     def last_name(self) -> str:
@@ -79,9 +72,11 @@ class Timing:
         if not isinstance(other, Timing):
             return NotImplemented
 
+        # Update in-place, so that references to self.events remain valid.
+        events = self.events
+        get = events.get
         for name, duration in other.events.items():
-            self_duration = self.events.get(name, 0.0)
-            self.events[name] = self_duration + duration
+            events[name] = get(name, 0.0) + duration
 
         return self
 
@@ -89,13 +84,29 @@ class Timing:
         return self.events[item]
 
     def __setitem__(self, key: str, value: float):
-        assert isinstance(key, str)
-        assert isinstance(value, float)
         self.events[key] = value
 
     def to_json_compat(self):
-        """Returns the timing info as JSON-compatible value.
+        """Returns the timing info as JSON-compatible value."""
+        return self.events.copy()
 
-        For now this dicards the order of the events.
-        """
-        return dict(self.events)
+
+class _RecordDuration:
+    """Context manager returned by Timing.record_duration()."""
+
+    __slots__ = ('timing', 'name', 'start_ns')
+
+    def __init__(self, timing: Timing, name: str) -> None:
+        self.timing = timing
+        self.name = name
+        self.start_ns = 0
+
+    def __enter__(self) -> None:
+        self.start_ns = time.monotonic_ns()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        duration = (time.monotonic_ns() - self.start_ns) / 1e9
+        events = self.timing.events
+        if __debug__ and self.name in events:
+            raise ValueError(f'{self.name} not expected in {events}')
+        events[self.name] = duration
@@ -28,20 +28,20 @@ class FlamencoManager:
                         init=False)
     _log = attrs_extra.log('%s.FlamencoManager' % __name__)
 
-    async def get(self, *args, loop, **kwargs) -> requests.Response:
-        return await self.client_request('GET', *args, loop=loop, **kwargs)
+    async def get(self, *args, **kwargs) -> requests.Response:
+        return await self.client_request('GET', *args, **kwargs)
 
-    async def post(self, *args, loop, **kwargs) -> requests.Response:
-        return await self.client_request('POST', *args, loop=loop, **kwargs)
+    async def post(self, *args, **kwargs) -> requests.Response:
+        return await self.client_request('POST', *args, **kwargs)
 
-    async def put(self, *args, loop, **kwargs) -> requests.Response:
-        return await self.client_request('PUT', *args, loop=loop, **kwargs)
+    async def put(self, *args, **kwargs) -> requests.Response:
+        return await self.client_request('PUT', *args, **kwargs)
 
-    async def delete(self, *args, loop, **kwargs) -> requests.Response:
-        return await self.client_request('DELETE', *args, loop=loop, **kwargs)
+    async def delete(self, *args, **kwargs) -> requests.Response:
+        return await self.client_request('DELETE', *args, **kwargs)
 
-    async def patch(self, *args, loop, **kwargs) -> requests.Response:
-        return await self.client_request('PATCH', *args, loop=loop, **kwargs)
+    async def patch(self, *args, **kwargs) -> requests.Response:
+        return await self.client_request('PATCH', *args, **kwargs)
 
     def __attrs_post_init__(self):
         self.user_agent = 'Flamenco-Worker/%s' % self.flamenco_worker_version
@@ -60,8 +60,7 @@ class FlamencoManager:
                              stream=None,
                              verify=None,
                              cert=None,
-                             json=None,
-                             loop) -> requests.Response:
+                             json=None) -> requests.Response:
         """Performs a HTTP request to the server.
 
         Creates and re-uses the HTTP session, to have efficient communication.
@@ -69,6 +68,7 @@ class FlamencoManager:
         if 'auth=...' (the async default), self.auth is used. If 'auth=None', no authentication is used.
         """
 
+        import asyncio
         import logging
         import urllib.parse
         from functools import partial
@@ -109,6 +109,7 @@ class FlamencoManager:
                            cert=cert,
                            json=json)
 
+        loop = asyncio.get_running_loop()
         resp = await loop.run_in_executor(self._executor, http_req)
 
         return resp
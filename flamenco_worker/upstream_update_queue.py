@@ -16,6 +16,11 @@ from . import attrs_extra, upstream
 BACKOFF_TIME = 5  # seconds
 SHUTDOWN_RECHECK_TIME = 0.5  # seconds
 
+# If there are more than this number of queued task updates, the worker won't
+# ask the Manager for another task to execute. Task execution is delayed until
+# the queue size is below this threshold.
+QUEUE_SIZE_THRESHOLD = 10
+
 
 @attr.s
 class TaskUpdateQueue:
@@ -28,7 +33,12 @@ class TaskUpdateQueue:
     shutdown_recheck_time = attr.ib(default=SHUTDOWN_RECHECK_TIME)
 
     _stuff_queued = attr.ib(default=attr.Factory(asyncio.Event), init=False)
+    # Created on first access, so that it's bound to the running event loop.
+    _below_threshold = attr.ib(default=None, init=False)  # type: typing.Optional[asyncio.Event]
     _db = attr.ib(default=None, init=False)
+    # Number of queued items. Counted in the database when connecting, and then kept
+    # up to date by queue() and _unqueue().
+    _queue_size = attr.ib(default=None, init=False)  # type: typing.Optional[int]
     _queue_lock = attr.ib(default=attr.Factory(asyncio.Lock), init=False)
     _log = attrs_extra.log('%s.TaskUpdateQueue' % __name__)
 
@@ -45,12 +55,16 @@ class TaskUpdateQueue:
         # Now that that is out of the way, we can use the default SQLite behaviour again.
         self._db.isolation_level = ''
 
+        result = self._db.execute('SELECT count(*) FROM fworker_queue')
+        self._queue_size = next(result)[0]
+
     def _disconnect_db(self):
         if self._db is None:
             return
         self._log.info('Disconnecting from database %s', self.db_fname)
         self._db.close()
         self._db = None
+        self._queue_size = None
 
     def queue(self, url, payload):
         """Push some payload onto the queue."""
@@ -64,11 +78,35 @@ class TaskUpdateQueue:
         self._db.execute('INSERT INTO fworker_queue (url, payload) values (?, ?)',
                          (url, pickled))
         self._db.commit()
+        self._queue_size += 1
 
         # Notify the work loop that stuff has been queued.
         self._stuff_queued.set()
+        self._update_below_threshold()
+
+    @property
+    def below_threshold_event(self) -> asyncio.Event:
+        """Event that is set while the queue size is at most QUEUE_SIZE_THRESHOLD."""
+
+        if self._below_threshold is None:
+            self._below_threshold = asyncio.Event()
+            self._update_below_threshold()
+        return self._below_threshold
+
+    def _update_below_threshold(self):
+        """Sets or clears the below-threshold event to reflect the queue size."""
 
-    async def work(self, *, loop=None):
+        if self._below_threshold is None:
+            return
+        below_threshold = self.queue_size() <= QUEUE_SIZE_THRESHOLD
+        if below_threshold == self._below_threshold.is_set():
+            return
+        if below_threshold:
+            self._below_threshold.set()
+        else:
+            self._below_threshold.clear()
+
+    async def work(self):
         """Loop that pushes queued payloads to the Flamenco Manager.
 
         Keeps running until shutdown_future.done() returns True.
@@ -81,8 +119,7 @@ class TaskUpdateQueue:
         while not self.shutdown_future.done():
             try:
                 await asyncio.wait_for(self._stuff_queued.wait(),
-                                       self.shutdown_recheck_time,
-                                       loop=loop)
+                                       self.shutdown_recheck_time)
             except asyncio.TimeoutError:
                 # This is normal, it just means that there wasn't anything queued within
                 # SHUTDOWN_RECHECK_TIME seconds.
@@ -92,7 +129,7 @@ class TaskUpdateQueue:
                 break
 
             self._log.debug('Inspecting queued task updates.')
-            await self.flush_and_catch(loop=loop)
+            await self.flush_and_catch()
 
         self._disconnect_db()
         self._log.warning('Stopping work loop')
@@ -119,20 +156,20 @@ class TaskUpdateQueue:
         """Return the number of items queued."""
         if self._db is None:
             self._connect_db()
-            assert self._db is not None
 
-        result = self._db.execute('SELECT count(*) FROM fworker_queue')
-        count = next(result)[0]
-        return count
+        assert self._queue_size is not None
+        return self._queue_size
 
     def _unqueue(self, rowid: int):
         """Removes a queued payload from the database."""
 
         # TODO Sybren: every once in a while, run 'vacuum' on the database.
-        self._db.execute('DELETE FROM fworker_queue WHERE rowid=?', (rowid,))
+        cursor = self._db.execute('DELETE FROM fworker_queue WHERE rowid=?', (rowid,))
         self._db.commit()
+        self._queue_size -= cursor.rowcount
+        self._update_below_threshold()
 
-    async def flush(self, *, loop: asyncio.AbstractEventLoop) -> bool:
+    async def flush(self) -> bool:
         """Tries to flush the queue to the Manager.
 
         Returns True iff the queue was empty, even before flushing.
@@ -147,7 +184,7 @@ class TaskUpdateQueue:
 
                 queue_size = self.queue_size()
                 self._log.info('Pushing task update to Manager, queue size is %d', queue_size)
-                resp = await self.manager.post(url, json=payload, loop=loop)
+                resp = await self.manager.post(url, json=payload)
                 if resp.status_code in {404, 409}:
                     # 404: Task doesn't exist (any more).
                     # 409: The task was assigned to another worker, so we're not allowed to
@@ -185,7 +222,7 @@ class TaskUpdateQueue:
 
             return queue_is_empty
 
-    async def flush_and_report(self, *, loop: asyncio.AbstractEventLoop):
+    async def flush_and_report(self):
         """Flushes the queue, and just reports errors, doesn't wait nor retry."""
 
         import requests
@@ -193,7 +230,7 @@ class TaskUpdateQueue:
         self._log.info('flush_and_report: trying one last push to get updates to Manager')
 
         try:
-            await self.flush(loop=loop)
+            await self.flush()
         except requests.ConnectionError:
             self._log.warning('flush_and_report: Unable to connect to Manager, '
                               'some items are still queued.')
@@ -204,13 +241,13 @@ class TaskUpdateQueue:
             self._log.exception('flush_and_report: Unexpected exception, '
                                 'Some items are still queued.')
 
-    async def flush_and_catch(self, *, loop: asyncio.AbstractEventLoop):
+    async def flush_and_catch(self):
         """Flushes the queue, reports errors and waits before returning for another try."""
 
         import requests
 
         try:
-            await self.flush(loop=loop)
+            await self.flush()
         except requests.ConnectionError:
             self._log.warning('Unable to connect to Manager, will retry later.')
             await asyncio.sleep(self.backoff_time)
@@ -2,9 +2,13 @@ import asyncio
 import datetime
 import enum
 import functools
+import io
 import itertools
+import math
 import pathlib
-import tempfile
+import secrets
+import stat
+import string
 import time
 import traceback
 import typing
@@ -25,6 +29,8 @@ FETCH_TASK_EMPTY_RETRY_DELAY = 5  # when there are no tasks to perform
 FETCH_TASK_DONE_SCHEDULE_NEW_DELAY = 3  # after a task is completed
 ERROR_RETRY_DELAY = 600  # after the pre-task sanity check failed
 UNCAUGHT_EXCEPTION_RETRY_DELAY = 60  # after single_iteration errored out
+WATCHDOG_INTERVAL = 60  # between checks that we're fetching or executing a task
+OUTPUT_PRODUCED_INTERVAL = 30  # minimum time between POSTs to /output-produced
 
 PUSH_LOG_MAX_ENTRIES = 1000
 PUSH_LOG_MAX_INTERVAL = datetime.timedelta(seconds=30)
@@ -32,10 +38,8 @@ PUSH_ACT_MAX_INTERVAL = datetime.timedelta(seconds=15)
 
 ASLEEP_POLL_STATUS_CHANGE_REQUESTED_DELAY = 30
 
-# If there are more than this number of queued task updates, we won't ask
-# the Manager for another task to execute. Task execution is delayed until
-# the queue size is below this threshold.
-QUEUE_SIZE_THRESHOLD = 10
+# Only the innermost frames of a traceback are sent to the Manager.
+TRACEBACK_MAX_FRAMES = 30
 
 
 class UnableToRegisterError(Exception):
@@ -53,7 +57,7 @@ class WorkerState(enum.Enum):
     SHUTTING_DOWN = 'shutting-down'
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class PreTaskCheckParams:
     pre_task_check_write: typing.Iterable[str] = []
     pre_task_check_read: typing.Iterable[str] = []
@@ -63,7 +67,7 @@ class PreTaskCheckFailed(PermissionError):
     """Raised when the pre-task sanity check fails."""
 
 
-@attr.s
+@attr.s(slots=True)
 class FlamencoWorker:
     manager = attr.ib(validator=attr.validators.instance_of(upstream.FlamencoManager))
     trunner = attr.ib()  # Instance of flamenco_worker.runner.TaskRunner
@@ -108,24 +112,30 @@ class FlamencoWorker:
         default=None, init=False,
         validator=attr.validators.optional(attr.validators.instance_of(str))
     )
+    # URL to push updates of the current task to; set together with task_id.
+    _task_update_url = attr.ib(default=None, init=False)  # type: typing.Optional[str]
     current_task_status = attr.ib(
         default=None, init=False,
         validator=attr.validators.optional(attr.validators.instance_of(str))
     )
-    _queued_log_entries = attr.ib(default=attr.Factory(list), init=False)  # type: typing.List[str]
-    _queue_lock = attr.ib(default=attr.Factory(asyncio.Lock), init=False)
+    # Log entries waiting to be pushed, already joined with newlines. Only accessed
+    # from the event loop, so no locking is needed.
+    _queued_log = attr.ib(default=attr.Factory(io.StringIO), init=False)
+    _queued_log_count = attr.ib(default=0, init=False)
 
-    # MyPy stumbles over the 'validator' argument here:
-    last_log_push = attr.ib(  # type: ignore
-        default=attr.Factory(datetime.datetime.now),
-        validator=attr.validators.optional(attr.validators.instance_of(datetime.datetime)))
-    last_activity_push = attr.ib(  # type: ignore
-        default=attr.Factory(datetime.datetime.now),
-        validator=attr.validators.optional(attr.validators.instance_of(datetime.datetime)))
+    # Timestamps from time.monotonic(), only used to compute intervals.
+    last_log_push = attr.ib(default=attr.Factory(time.monotonic),
+                            validator=attr.validators.instance_of(float))
+    last_activity_push = attr.ib(default=attr.Factory(time.monotonic),
+                                 validator=attr.validators.instance_of(float))
 
     # Kept in sync with the task updates we send to upstream Manager, so that we can send
     # a complete Activity each time.
     last_task_activity = attr.ib(default=attr.Factory(documents.Activity))
+    # The last_task_activity as dict, ready to be pushed to the Manager. It is
+    # updated along with last_task_activity, so that it doesn't have to be
+    # converted for every push.
+    _activity_payload = attr.ib(init=False)  # type: typing.Dict[str, typing.Any]
 
     # Configuration
     push_log_max_interval = attr.ib(default=PUSH_LOG_MAX_INTERVAL,
@@ -138,16 +148,15 @@ class FlamencoWorker:
     pretask_check_params = attr.ib(factory=PreTaskCheckParams,
                                    validator=attr.validators.instance_of(PreTaskCheckParams))
 
-    # Futures that represent delayed calls to push_to_manager().
-    # They are scheduled when logs & activities are registered but not yet pushed. They are
-    # cancelled when a push_to_manager() actually happens for another reason. There are different
-    # futures for activity and log pushing, as these can have different max intervals.
-    _push_log_to_manager = attr.ib(
-        default=None, init=False,
-        validator=attr.validators.optional(attr.validators.instance_of(asyncio.Future)))
-    _push_act_to_manager = attr.ib(
-        default=None, init=False,
-        validator=attr.validators.optional(attr.validators.instance_of(asyncio.Future)))
+    # Timer for a deferred push to the Manager, shared by activity and log updates
+    # that don't have to be pushed immediately. It is moved forward when an update
+    # needs to be pushed sooner, and cancelled by push_to_manager().
+    # Not validated, as uvloop's timer handles are not asyncio.TimerHandle instances;
+    # they do offer the same when() and cancel() methods.
+    _push_timer = attr.ib(default=None, init=False)  # type: typing.Optional[asyncio.TimerHandle]
+
+    # See self._watchdog_tick()
+    _watchdog_handle = attr.ib(default=None, init=False)  # type: typing.Optional[asyncio.Handle]
 
     # When the worker is shutting down, the currently running task will be
     # handed back to the manager for re-scheduling. In such a situation,
@@ -157,7 +166,24 @@ class FlamencoWorker:
 
     _log = attrs_extra.log('%s.FlamencoWorker' % __name__)
 
-    _last_output_produced = 0.0  # seconds since epoch
+    # See self.output_produced()
+    _last_output_produced = attr.ib(default=-math.inf, init=False)  # time.monotonic() timestamp
+    # Paths produced since the last POST, in order. Only the keys are used.
+    _pending_output = attr.ib(default=attr.Factory(dict),
+                              init=False)  # type: typing.Dict[str, None]
+    _output_produced_timer = attr.ib(default=None,
+                                     init=False)  # type: typing.Optional[asyncio.Handle]
+
+    @_activity_payload.default
+    def _activity_payload_default(self) -> typing.Dict[str, typing.Any]:
+        return self._activity_as_payload(self.last_task_activity)
+
+    @staticmethod
+    def _activity_as_payload(activity: documents.Activity) -> typing.Dict[str, typing.Any]:
+        payload = attr.asdict(activity)
+        if payload['metrics'] is None:
+            del payload['metrics']
+        return payload
 
     @property
     def active_task_id(self) -> typing.Optional[str]:
@@ -189,6 +215,7 @@ class FlamencoWorker:
             self.ack_status_change(self.initial_state)
 
         self.schedule_fetch_task()
+        self._watchdog_handle = self.loop.call_later(WATCHDOG_INTERVAL, self._watchdog_tick)
 
     @staticmethod
     @functools.lru_cache(maxsize=1)
@@ -209,9 +236,8 @@ class FlamencoWorker:
                                        may_retry_loop: bool,
                                        extra_headers: typing.Optional[dict] = None,
                                        ) -> requests.Response:
-        post_kwargs = {
+        post_kwargs: typing.Dict[str, typing.Any] = {
             'json': json,
-            'loop': self.loop,
         }
         if not use_auth:
             post_kwargs['auth'] = None
@@ -334,11 +360,25 @@ class FlamencoWorker:
 
     def mainloop(self):
         self._log.info('Entering main loop')
-
-        # TODO: add "watchdog" task that checks the asyncio loop and ensures there is
-        # always either a task being executed or a task fetch scheduled.
         self.loop.run_forever()
 
+    def _watchdog_tick(self):
+        """Ensures that, when awake, a task is being fetched or executed.
+
+        Reschedules itself with loop.call_later(), so that there is no coroutine
+        sleeping in between checks.
+        """
+
+        fetching = self.single_iteration_fut is not None and not self.single_iteration_fut.done()
+        executing = self.asyncio_execution_fut is not None \
+                    and not self.asyncio_execution_fut.done()
+        if self.state == WorkerState.AWAKE and not (fetching or executing):
+            self._log.warning('Watchdog: awake but not fetching nor executing a task, '
+                              'scheduling a task fetch')
+            self.schedule_fetch_task()
+
+        self._watchdog_handle = self.loop.call_later(WATCHDOG_INTERVAL, self._watchdog_tick)
+
     def schedule_fetch_task(self, delay=0):
         """Schedules a task fetch.
 
@@ -417,11 +457,11 @@ class FlamencoWorker:
         self._log.info('Returning task %s to the Manager queue', task_id)
 
         await self.push_to_manager()
-        await self.tuqueue.flush_and_report(loop=self.loop)
+        await self.tuqueue.flush_and_report()
 
         url = f'/tasks/{task_id}/return'
         try:
-            resp = await self.manager.post(url, loop=self.loop)
+            resp = await self.manager.post(url)
         except IOError as ex:
             self._log.exception('Exception POSTing to %s', url)
             return
@@ -443,6 +483,10 @@ class FlamencoWorker:
         self.state = WorkerState.SHUTTING_DOWN
         self.failures_are_acceptable = True
 
+        if self._watchdog_handle is not None:
+            self._watchdog_handle.cancel()
+        if self._output_produced_timer is not None:
+            self._output_produced_timer.cancel()
         self.stop_fetching_tasks()
         self.stop_sleeping()
 
@@ -450,22 +494,23 @@ class FlamencoWorker:
         self.loop.run_until_complete(self.trunner.abort_current_task())
 
         # Queue anything that should still be pushed to the Manager
-        push_act_sched = self._push_act_to_manager is not None \
-                         and not self._push_act_to_manager.done()
-        push_log_sched = self._push_log_to_manager is not None \
-                         and not self._push_log_to_manager.done()
-        if push_act_sched or push_log_sched:
+        if self._push_timer is not None:
             # Try to push queued task updates to manager before shutting down
             self._log.info('shutdown(): pushing queued updates to manager')
             self.loop.run_until_complete(self.push_to_manager())
 
         # Try to do a final push of queued updates to the Manager.
-        self.loop.run_until_complete(self.tuqueue.flush_and_report(loop=self.loop))
+        self.loop.run_until_complete(self.tuqueue.flush_and_report())
+
+        # Don't lose output that was still waiting for its throttle timer.
+        if self._pending_output:
+            self._log.info('shutdown(): sending produced output to manager')
+            self.loop.run_until_complete(self._send_output_produced())
 
         # Let the Manager know we're shutting down
         self._log.info('shutdown(): signing off at Manager')
         try:
-            self.loop.run_until_complete(self.manager.post('/sign-off', loop=self.loop))
+            self.loop.run_until_complete(self.manager.post('/sign-off'))
         except Exception as ex:
             self._log.warning('Error signing off. Continuing with shutdown. %s', ex)
 
@@ -508,13 +553,11 @@ class FlamencoWorker:
         # Prevent outgoing queue overflowing by waiting until it's below the
         # threshold before starting another task.
         # TODO(sybren): introduce another worker state for this, and handle there.
-        async with self._queue_lock:
-            queue_size = self.tuqueue.queue_size()
-        if queue_size > QUEUE_SIZE_THRESHOLD:
+        below_threshold = self.tuqueue.below_threshold_event
+        if not below_threshold.is_set():
             self._log.info('Task Update Queue size too large (%d > %d), waiting until it shrinks.',
-                           queue_size, QUEUE_SIZE_THRESHOLD)
-            self.schedule_fetch_task(FETCH_TASK_FAILED_RETRY_DELAY)
-            return
+                           self.tuqueue.queue_size(), upstream_update_queue.QUEUE_SIZE_THRESHOLD)
+            await below_threshold.wait()
 
         try:
             self.pre_task_sanity_check()
@@ -534,38 +577,51 @@ class FlamencoWorker:
         log = self._log.getChild('fetch_task')
         log.debug('Fetching task')
         try:
-            resp = await self.manager.post('/task', loop=self.loop)
+            resp = await self.manager.post('/task')
         except requests.exceptions.RequestException as ex:
             log.warning('Error fetching new task, will retry in %i seconds: %s',
                         FETCH_TASK_FAILED_RETRY_DELAY, ex)
             self.schedule_fetch_task(FETCH_TASK_FAILED_RETRY_DELAY)
             return None
 
-        if resp.status_code == 204:
-            log.debug('No tasks available, will retry in %i seconds.',
-                      FETCH_TASK_EMPTY_RETRY_DELAY)
-            self.schedule_fetch_task(FETCH_TASK_EMPTY_RETRY_DELAY)
-            return None
-
-        if resp.status_code == 423:
-            status_change = documents.StatusChangeRequest(**resp.json())
-            log.info('status change to %r requested when fetching new task',
-                     status_change.status_requested)
-            self.change_status(status_change.status_requested)
-            return None
-
-        if resp.status_code != 200:
-            log.warning('Error %i fetching new task, will retry in %i seconds.',
-                        resp.status_code, FETCH_TASK_FAILED_RETRY_DELAY)
-            self.schedule_fetch_task(FETCH_TASK_FAILED_RETRY_DELAY)
-            return None
+        handler = self._FETCH_TASK_HANDLERS.get(resp.status_code, FlamencoWorker._fetch_task_error)
+        return handler(self, resp, log)
 
+    def _fetch_task_received(self, resp: requests.Response, log) -> typing.Optional[dict]:
         task_info = resp.json()
         self.task_id = task_info['_id']
+        self._task_update_url = f'/tasks/{self.task_id}/update'
         log.info('Received task: %s', self.task_id)
         log.debug('Received task: %s', task_info)
         return task_info
 
+    def _fetch_task_none_available(self, resp: requests.Response, log) -> typing.Optional[dict]:
+        log.debug('No tasks available, will retry in %i seconds.',
+                  FETCH_TASK_EMPTY_RETRY_DELAY)
+        self.schedule_fetch_task(FETCH_TASK_EMPTY_RETRY_DELAY)
+        return None
+
+    def _fetch_task_status_change(self, resp: requests.Response, log) -> typing.Optional[dict]:
+        status_change = documents.StatusChangeRequest(**resp.json())
+        log.info('status change to %r requested when fetching new task',
+                 status_change.status_requested)
+        self.change_status(status_change.status_requested)
+        return None
+
+    def _fetch_task_error(self, resp: requests.Response, log) -> typing.Optional[dict]:
+        log.warning('Error %i fetching new task, will retry in %i seconds.',
+                    resp.status_code, FETCH_TASK_FAILED_RETRY_DELAY)
+        self.schedule_fetch_task(FETCH_TASK_FAILED_RETRY_DELAY)
+        return None
+
+    # Handlers for the response of the Manager's /task endpoint, by HTTP status code.
+    # Any other status code is handled by _fetch_task_error().
+    _FETCH_TASK_HANDLERS = {
+        200: _fetch_task_received,
+        204: _fetch_task_none_available,
+        423: _fetch_task_status_change,
+    }
+
     async def execute_task(self, task_info: dict) -> None:
         """Feed a task to the task runner and monitor for exceptions."""
         try:
@@ -602,8 +658,7 @@ class FlamencoWorker:
                 # Such a failure will always result in a failed task, even when
                 # self.failures_are_acceptable = True; only expected failures are
                 # acceptable then.
-                async with self._queue_lock:
-                    self._queued_log_entries.append(traceback.format_exc())
+                self._queue_log_entry(traceback.format_exc(limit=-TRACEBACK_MAX_FRAMES))
                 await self.register_task_update(
                     task_status='failed',
                     activity='Uncaught exception: %s %s' % (type(ex).__name__, ex),
@@ -625,24 +680,32 @@ class FlamencoWorker:
         """Cleans up internal state to prepare for a new task to be executed."""
 
         self.last_task_activity = documents.Activity()
+        self._activity_payload = self._activity_as_payload(self.last_task_activity)
         self.task_is_silently_aborting = False
         self.current_task_status = ''
 
-    async def push_to_manager(self, *, delay: datetime.timedelta = None):
+    def _schedule_push(self, delay: datetime.timedelta):
+        """Ensures that a push to the Manager happens within 'delay' from now."""
+
+        delay_sec = delay.total_seconds()
+        if self._push_timer is not None:
+            if self._push_timer.when() <= self.loop.time() + delay_sec:
+                return
+            self._push_timer.cancel()
+
+        self._log.debug('Scheduled delayed push to manager in %r seconds', delay_sec)
+        self._push_timer = self.loop.call_later(delay_sec, self._push_timer_fired)
+
+    def _push_timer_fired(self):
+        self._push_timer = None
+        asyncio.ensure_future(self.push_to_manager(), loop=self.loop)
+
+    async def push_to_manager(self):
         """Updates a task's status and activity.
 
         Uses the TaskUpdateQueue to handle persistent queueing.
         """
 
-        if delay is not None:
-            delay_sec = delay.total_seconds()
-            self._log.debug('Scheduled delayed push to manager in %r seconds', delay_sec)
-            await asyncio.sleep(delay_sec)
-
-            assert self.shutdown_future is not None
-            if self.shutdown_future.done():
-                self._log.info('Shutting down, not pushing changes to manager.')
-
         self._log.info('Updating task %s with status %r and activity %r',
                        self.task_id, self.current_task_status, self.last_task_activity)
 
@@ -650,34 +713,29 @@ class FlamencoWorker:
         if self.task_is_silently_aborting:
             self._log.info('push_to_manager: task is silently aborting, will only push logs')
         else:
-            payload = attr.asdict(self.last_task_activity,
-                                  # Prevent sending an empty metrics dict:
-                                  filter=lambda attr, value: attr.name != 'metrics' or value)
+            payload = dict(self._activity_payload)
             if self.current_task_status:
                 payload['task_status'] = self.current_task_status
 
-        now = datetime.datetime.now()
+        now = time.monotonic()
         self.last_activity_push = now
 
-        # Cancel any pending push task, as we're pushing activities now.
-        if self._push_act_to_manager is not None:
-            self._push_act_to_manager.cancel()
+        # Everything is pushed now, so a deferred push is no longer necessary.
+        if self._push_timer is not None:
+            self._push_timer.cancel()
+            self._push_timer = None
 
-        async with self._queue_lock:
-            if self._queued_log_entries:
-                payload['log'] = '\n'.join(self._queued_log_entries)
-                self._queued_log_entries.clear()
-                self.last_log_push = now
-
-                # Cancel any pending push task, as we're pushing logs now.
-                if self._push_log_to_manager is not None:
-                    self._push_log_to_manager.cancel()
+        if self._queued_log_count:
+            payload['log'] = self._queued_log.getvalue()
+            self._queued_log = io.StringIO()
+            self._queued_log_count = 0
+            self.last_log_push = now
 
         if not payload:
             self._log.debug('push_to_manager: nothing to push')
             return
 
-        self.tuqueue.queue('/tasks/%s/update' % self.task_id, payload)
+        self.tuqueue.queue(self._task_update_url, payload)
 
     async def register_task_update(self, *,
                                    task_status: str = None,
@@ -691,16 +749,32 @@ class FlamencoWorker:
 
         self._log.debug('Task update: task_status=%s, %s', task_status, kwargs)
 
+        activity = self.last_task_activity
+        activity_payload = self._activity_payload
+        activity_changed = False
+
         # Update the current activity
         for key, value in kwargs.items():
-            setattr(self.last_task_activity, key, value)
+            if getattr(activity, key) == value:
+                continue
+            setattr(activity, key, value)
+            activity_payload[key] = value
+            activity_changed = True
 
         # If we have timing information about the current task, include that too.
         timing_metrics = self.trunner.aggr_timing_info
         if timing_metrics:
-            self.last_task_activity.metrics['timing'] = timing_metrics.to_json_compat()
+            metrics = {'timing': timing_metrics.to_json_compat()}  # type: typing.Optional[dict]
         else:
-            self.last_task_activity.metrics.pop('timing', None)
+            metrics = None
+
+        if metrics != activity.metrics:
+            activity.metrics = metrics
+            activity_changed = True
+            if metrics is None:
+                activity_payload.pop('metrics', None)
+            else:
+                activity_payload['metrics'] = metrics
 
         if task_status is None:
             task_status_changed = False
@@ -708,18 +782,32 @@ class FlamencoWorker:
             task_status_changed = self.current_task_status != task_status
             self.current_task_status = task_status
 
+        if not (activity_changed or task_status_changed):
+            # Any earlier change has already been pushed or scheduled for pushing.
+            return
+
         if task_status_changed:
             self._log.info('Task changed status to %s, pushing to manager', task_status)
             await self.push_to_manager()
-        elif datetime.datetime.now() - self.last_activity_push > self.push_act_max_interval:
+        elif (time.monotonic() - self.last_activity_push
+              > self.push_act_max_interval.total_seconds()):
             self._log.info('More than %s since last activity update, pushing to manager',
                            self.push_act_max_interval)
             await self.push_to_manager()
-        elif self._push_act_to_manager is None or self._push_act_to_manager.done():
-            # Schedule a future push to manager.
-            self._push_act_to_manager = asyncio.ensure_future(
-                self.push_to_manager(delay=self.push_act_max_interval),
-                loop=self.loop)
+        else:
+            self._schedule_push(self.push_act_max_interval)
+
+    def _queue_log_entry(self, log_entry: str) -> int:
+        """Queues a log entry for pushing to the Manager.
+
+        :returns: the number of queued log entries.
+        """
+
+        if self._queued_log_count:
+            self._queued_log.write('\n')
+        self._queued_log.write(log_entry)
+        self._queued_log_count += 1
+        return self._queued_log_count
 
     async def register_log(self, log_entry: str, *fmt_args):
         """Registers a log entry, and possibly sends all queued log entries to upstream Manager.
@@ -728,29 +816,24 @@ class FlamencoWorker:
         of methods.
         """
 
-        from . import tz
-
         if fmt_args:
             log_entry %= fmt_args
 
-        now = datetime.datetime.now(tz.tzutc()).isoformat()
-        async with self._queue_lock:
-            self._queued_log_entries.append('%s: %s' % (now, log_entry))
-            queue_size = len(self._queued_log_entries)
+        # datetime.timezone.utc is implemented in C, which makes it cheaper than tz.tzutc()
+        # on this hot path, while producing the same '+00:00' suffix.
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        queue_size = self._queue_log_entry(f'{now}: {log_entry}')
 
         if queue_size > self.push_log_max_entries:
             self._log.info('Queued up %i > %i log entries, pushing to manager',
                            queue_size, self.push_log_max_entries)
             await self.push_to_manager()
-        elif datetime.datetime.now() - self.last_log_push > self.push_log_max_interval:
+        elif time.monotonic() - self.last_log_push > self.push_log_max_interval.total_seconds():
             self._log.info('More than %s since last log update, pushing to manager',
                            self.push_log_max_interval)
             await self.push_to_manager()
-        elif self._push_log_to_manager is None or self._push_log_to_manager.done():
-            # Schedule a future push to manager.
-            self._push_log_to_manager = asyncio.ensure_future(
-                self.push_to_manager(delay=self.push_log_max_interval),
-                loop=self.loop)
+        else:
+            self._schedule_push(self.push_log_max_interval)
 
     def output_produced(self, *paths: typing.Union[str, pathlib.PurePath]):
         """Registers a produced output (e.g. rendered frame) with the manager.
@@ -758,22 +841,43 @@ class FlamencoWorker:
         This performs a HTTP POST in a background task, returning as soon as
         the task is scheduled.
 
-        Only sends an update every X seconds, to avoid sending too many
-        requests when we output frames rapidly.
+        Only sends an update every OUTPUT_PRODUCED_INTERVAL seconds, to avoid
+        sending too many requests when we output frames rapidly. Outputs that
+        are produced in between are not dropped; they are all sent together
+        once the interval has passed.
         """
 
-        now = time.time()
-        if now - self._last_output_produced < 30:
+        self._pending_output.update(dict.fromkeys(str(p) for p in paths))
+        if self._output_produced_timer is not None:
             self._log.debug('Throttling POST to Manager /output-produced endpoint')
             return
-        self._last_output_produced = now
+
+        wait = self._last_output_produced + OUTPUT_PRODUCED_INTERVAL - time.monotonic()
+        if wait > 0:
+            self._log.debug('Throttling POST to Manager /output-produced endpoint, '
+                            'sending in %.1f seconds', wait)
+            self._output_produced_timer = self.loop.call_later(
+                wait, self._send_output_produced)
+            return
+
+        self._send_output_produced()
+
+    def _send_output_produced(self) -> asyncio.Task:
+        """Sends all output produced since the last POST to the Manager.
+
+        :returns: the task that performs the POST.
+        """
+
+        paths = list(self._pending_output)
+        self._pending_output = {}
+        self._output_produced_timer = None
+        self._last_output_produced = time.monotonic()
 
         async def do_post():
             try:
                 self._log.info('Sending %i path(s) to Manager', len(paths))
                 resp = await self.manager.post('/output-produced',
-                                               json={'paths': [str(p) for p in paths]},
-                                               loop=self.loop)
+                                               json={'paths': paths})
                 if resp.status_code == 204:
                     self._log.info('Manager accepted our output notification for %s', paths)
                 else:
@@ -782,26 +886,20 @@ class FlamencoWorker:
             except Exception:
                 self._log.exception('error POSTing to manager /output-produced')
 
-        self.loop.create_task(do_post())
+        return self.loop.create_task(do_post())
 
     def change_status(self, new_status: str):
         """Called whenever the Flamenco Manager has a change in current status for us."""
 
         self._log.info('Manager requested we go to status %r', new_status)
-        status_change_handlers = {
-            'asleep': self.go_to_state_asleep,
-            'awake': self.go_to_state_awake,
-            'shutdown': self.go_to_state_shutdown,
-            'error': self.go_to_state_error,
-        }
 
         try:
-            handler = status_change_handlers[new_status]
+            handler = self._STATUS_CHANGE_HANDLERS[new_status]
         except KeyError:
             self._log.error('We have no way to go to status %r, going to sleep instead', new_status)
-            handler = self.go_to_state_asleep
+            handler = FlamencoWorker.go_to_state_asleep
 
-        handler()
+        handler(self)
 
     def ack_status_change(self, new_status: str) -> typing.Optional[asyncio.Task]:
         """Confirm that we're now in a certain state.
@@ -811,7 +909,7 @@ class FlamencoWorker:
         """
 
         try:
-            post = self.manager.post('/ack-status-change/%s' % new_status, loop=self.loop)
+            post = self.manager.post('/ack-status-change/%s' % new_status)
             return self.loop.create_task(post)
         except Exception:
             self._log.exception('unable to notify Manager')
@@ -859,6 +957,15 @@ class FlamencoWorker:
         self.ack_status_change(self.state.value)
         self.sleeping_fut = self.loop.create_task(self.sleeping_for_error())
 
+    # Handlers for a status change requested by the Manager, by requested status.
+    # Any other status is handled by go_to_state_asleep().
+    _STATUS_CHANGE_HANDLERS = {
+        'asleep': go_to_state_asleep,
+        'awake': go_to_state_awake,
+        'shutdown': go_to_state_shutdown,
+        'error': go_to_state_error,
+    }
+
     def stop_sleeping(self):
         """Stops the asyncio task for sleeping."""
         if self.sleeping_fut is None or self.sleeping_fut.done():
@@ -877,7 +984,7 @@ class FlamencoWorker:
         while self.state != WorkerState.SHUTTING_DOWN and self.loop.is_running():
             try:
                 await asyncio.sleep(ASLEEP_POLL_STATUS_CHANGE_REQUESTED_DELAY)
-                resp = await self.manager.get('/status-change', loop=self.loop)
+                resp = await self.manager.get('/status-change')
 
                 if resp.status_code == 204:
                     # No change, don't do anything
@@ -930,9 +1037,12 @@ class FlamencoWorker:
         for read_name in pre_task_check_read:
             read_path = pathlib.Path(read_name).absolute()
             log.debug('   - Read check on %s', read_path)
-            if not read_path.exists():
+            try:
+                # A single stat() call both checks existence and tells us the file type.
+                read_mode = read_path.stat().st_mode
+            except (FileNotFoundError, NotADirectoryError):
                 raise PreTaskCheckFailed('%s does not exist' % read_path) from None
-            if read_path.is_dir():
+            if stat.S_ISDIR(read_mode):
                 try:
                     (read_path / 'anything').stat()
                 except PermissionError:
@@ -955,6 +1065,8 @@ class FlamencoWorker:
         if not pre_task_check_write:
             return
 
+        import tempfile
+
         log = self._log.getChild('sanity_check')
         log.debug('Performing pre-task write check')
         for write_name in pre_task_check_write:
@@ -964,12 +1076,17 @@ class FlamencoWorker:
             post_delete = False
             try:
                 if write_path.is_dir():
-                    testfile = tempfile.TemporaryFile('w', dir=str(write_path), encoding='utf8')
+                    with tempfile.TemporaryFile('wb', dir=str(write_path)) as outfile:
+                        outfile.write(b'\0')
+                elif write_path.exists():
+                    # Opening for appending is enough to check for write permission,
+                    # without altering the existing file.
+                    with write_path.open('ab'):
+                        pass
                 else:
-                    post_delete = not write_path.exists()
-                    testfile = write_path.open('a+', encoding='utf8')
-                with testfile as outfile:
-                    outfile.write('♥')
+                    post_delete = True
+                    with write_path.open('wb') as outfile:
+                        outfile.write(b'\0')
             except (PermissionError, FileNotFoundError):
                 raise PreTaskCheckFailed('%s is not writable' % write_path) from None
             if post_delete:
@@ -979,19 +1096,16 @@ class FlamencoWorker:
                     log.warning('Unable to delete write-test-file %s', write_path)
 
 
-def generate_secret() -> str:
-    """Generates a 64-character secret key."""
+_SECRET_CHARS = string.ascii_letters + string.digits
 
-    import random
-    import string
 
-    randomizer = random.SystemRandom()
-    tokens = string.ascii_letters + string.digits
-    secret = ''.join(randomizer.choice(tokens) for _ in range(64))
+def generate_secret() -> str:
+    """Generates a 64-character secret key."""
 
-    return secret
+    return ''.join(secrets.choice(_SECRET_CHARS) for _ in range(64))
 
 
+@functools.lru_cache(maxsize=1)
 def detect_platform() -> str:
     """Detects the platform, returning 'linux', 'windows' or 'darwin'.
 
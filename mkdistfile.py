@@ -2,9 +2,12 @@
 
 """Builds a distributable file."""
 
+import itertools
+import os
 import platform
 import re
 import shutil
+import subprocess
 import sys
 from pathlib import Path
 
@@ -15,6 +18,7 @@ from flamenco_worker import __version__
 def create_tar(prefix: str, dist_dir: Path):
     """Creates a gzipped tarball.
 
+    Uses pigz for multi-threaded compression when it is available.
     Removes the directory that was tarballed.
     """
     import tarfile
@@ -23,8 +27,34 @@ def create_tar(prefix: str, dist_dir: Path):
     tar_path = dist_dir / tar_fname
     to_tar = str(dist_dir / prefix)
 
-    with tarfile.open(str(tar_path), 'w:gz') as tar:
-        tar.add(to_tar, prefix, recursive=True)
+    pigz = shutil.which('pigz')
+    if pigz:
+        try:
+            with tar_path.open('wb') as outfile:
+                proc = subprocess.Popen([pigz, '-c'], stdin=subprocess.PIPE, stdout=outfile)
+                try:
+                    with tarfile.open(fileobj=proc.stdin, mode='w|') as tar:
+                        tar.add(to_tar, prefix, recursive=True)
+                except BaseException:
+                    # Don't leave an orphaned compressor behind.
+                    proc.kill()
+                    raise
+                finally:
+                    try:
+                        proc.stdin.close()
+                    except BrokenPipeError:
+                        # pigz has stopped, so the buffered data cannot be written any more.
+                        pass
+                    proc.wait()
+            if proc.returncode != 0:
+                raise SystemExit('pigz exited with status %d' % proc.returncode)
+        except BaseException:
+            # Don't leave a half-written archive behind either.
+            tar_path.unlink()
+            raise
+    else:
+        with tarfile.open(str(tar_path), 'w:gz') as tar:
+            tar.add(to_tar, prefix, recursive=True)
 
     shutil.rmtree(to_tar)
     print('Created', tar_path)
@@ -42,8 +72,11 @@ def create_zip(prefix: str, dist_dir: Path):
     to_zip = dist_dir / prefix
 
     with zipfile.ZipFile(str(zip_path), 'w', zipfile.ZIP_DEFLATED) as zfile:
-        for fpath in to_zip.glob('**/*'):
-            zfile.write(str(fpath), str(fpath.relative_to(to_zip)))
+        # os.walk() uses os.scandir(), which avoids a stat() call per file.
+        for dirpath, dirnames, filenames in os.walk(str(to_zip)):
+            for name in itertools.chain(dirnames, filenames):
+                fpath = os.path.join(dirpath, name)
+                zfile.write(fpath, os.path.relpath(fpath, str(to_zip)))
 
     shutil.rmtree(str(to_zip))
     print('Created', zip_path)
@@ -1,11 +1,9 @@
 #!/usr/bin/env python
 
 from pathlib import Path
-import collections
-import hashlib
+import os
 import setuptools
 import sys
-import zipfile
 
 from distutils.cmd import Command
 from distutils.errors import DistutilsOptionError
@@ -33,6 +31,11 @@ class ZipCommand(Command):
             self.dist_dir = "dist"
 
     def run(self):
+        # Only needed for this command, so don't import for every setup.py invocation.
+        import functools
+        import hashlib
+        import zipfile
+
         self.run_command('bdist_wheel')
         if not self.distribution.dist_files:
             msg = "No dist file created, even though we ran 'bdist_wheel' ourselves."
@@ -59,24 +62,22 @@ class ZipCommand(Command):
             add_to_root(Path('flamenco_worker/resources/merge-exr.blend'))
             add_to_root(Path('flamenco_worker/resources/exr_sequence_to_jpeg.py'))
 
-            paths = collections.deque([Path('system-integration')])
-            while paths:
-                this_path = paths.popleft()
-                if this_path.is_dir():
-                    paths.extend(this_path.iterdir())
-                    continue
-
-                log.info('    adding %s', this_path)
-                archive.write(str(this_path), str(this_path))
+            # os.walk() uses os.scandir(), which avoids a stat() call per file.
+            for dirpath, _, filenames in os.walk('system-integration'):
+                for filename in filenames:
+                    this_path = os.path.join(dirpath, filename)
+                    log.info('    adding %s', this_path)
+                    archive.write(this_path, this_path)
 
         # Compute SHA256 checksum of the produced zip file.
-        hasher = hashlib.sha256()
-        blocksize = 65536
         with zip_name.open(mode='rb') as infile:
-            buf = infile.read(blocksize)
-            while len(buf) > 0:
-                hasher.update(buf)
-                buf = infile.read(blocksize)
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+ runs the read/hash loop in C.
+                hasher = hashlib.file_digest(infile, 'sha256')
+            else:
+                hasher = hashlib.sha256()
+                for buf in iter(functools.partial(infile.read, 65536), b''):
+                    hasher.update(buf)
         checksum_path = zip_name.with_suffix('.sha256')
         log.info('Writing SHA256 checksum to %s', checksum_path)
         with checksum_path.open(mode='w') as shafile:
@@ -103,8 +104,11 @@ if __name__ == '__main__':
         install_requires=[
             'attrs >=16.3.0',
             'requests>=2.12.4',
-            'pyjwt>=1.7.1',
         ],
+        extras_require={
+            # Faster event loop; not available on Windows.
+            'uvloop': ['uvloop>=0.14; sys_platform != "win32"'],
+        },
         entry_points={'console_scripts': [
             'flamenco-worker = flamenco_worker.cli:main',
         ]},
@@ -1,8 +1,10 @@
+import typing
+
 import attr
 import requests
 
 
-@attr.s
+@attr.s(auto_attribs=True, slots=True)
 class JsonResponse:
     """Mocked HTTP response returning JSON.
 
@@ -10,8 +12,8 @@ class JsonResponse:
     or to using the responses package.
     """
 
-    _json = attr.ib()
-    status_code = attr.ib(default=200, validator=attr.validators.instance_of(int))
+    _json: typing.Any
+    status_code: int = 200
 
     def json(self):
         return self._json
@@ -23,7 +25,7 @@ class JsonResponse:
         raise requests.HTTPError(self.status_code)
 
 
-@attr.s
+@attr.s(auto_attribs=True, slots=True)
 class TextResponse:
     """Mocked HTTP response returning text.
 
@@ -31,8 +33,8 @@ class TextResponse:
     or to using the responses package.
     """
 
-    text = attr.ib(default='', validator=attr.validators.instance_of(str))
-    status_code = attr.ib(default=200, validator=attr.validators.instance_of(int))
+    text: str = ''
+    status_code: int = 200
 
     def raise_for_status(self):
         if 200 <= self.status_code < 300:
@@ -41,7 +43,7 @@ class TextResponse:
         raise requests.HTTPError(self.status_code)
 
 
-@attr.s
+@attr.s(auto_attribs=True, slots=True)
 class EmptyResponse:
     """Mocked HTTP response returning an empty 204.
 
@@ -49,7 +51,7 @@ class EmptyResponse:
     or to using the responses package.
     """
 
-    status_code = attr.ib(default=204, validator=attr.validators.instance_of(int))
+    status_code: int = 204
 
     def raise_for_status(self):
         pass
@@ -71,11 +73,16 @@ def CoroMock(return_value=None, side_effect=...):
     coromock.coro.return_value or coromock.coro.side_effect.
     """
 
-    import asyncio
     from unittest.mock import Mock
 
     coro = Mock(name="CoroutineResult")
-    corofunc = Mock(name="CoroutineFunction", side_effect=asyncio.coroutine(coro))
+
+    # unittest.mock.AsyncMock requires Python 3.8, and asyncio.coroutine()
+    # is deprecated, so wrap the result mock in a native coroutine function.
+    async def call_coro(*args, **kwargs):
+        return coro(*args, **kwargs)
+
+    corofunc = Mock(name="CoroutineFunction", side_effect=call_coro)
     corofunc.coro = coro
 
     if return_value is not ...:
@@ -84,3 +91,14 @@ def CoroMock(return_value=None, side_effect=...):
         corofunc.coro.side_effect = side_effect
 
     return corofunc
+
+
+def done_future(loop, value=None):
+    """Return a future on the given loop that already has a result.
+
+    Cheaper than CoroMock for mocking an awaitable, such as
+    asyncio.subprocess.Process.wait(), that never needs call assertions.
+    """
+    future = loop.create_future()
+    future.set_result(value)
+    return future
@@ -10,11 +10,27 @@ from tests.test_runner import AbstractCommandTest
 
 class BlenderRenderTest(AbstractCommandTest):
     thisfile = Path(__file__).as_posix()
+    thisdir = Path(__file__).parent.as_posix()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        from flamenco_worker.commands import BlenderRenderCommand
+        from flamenco_worker.worker import FlamencoWorker
+
+        # Shared by the tests that only call pure methods and never change the command.
+        cls.cmd_ro = BlenderRenderCommand(
+            worker=mock.Mock(spec=FlamencoWorker),
+            task_id='12345',
+            command_idx=0,
+        )
 
     def setUp(self):
         super().setUp()
 
         from flamenco_worker.commands import BlenderRenderCommand
+        from tests.mock_responses import CoroMock
 
         self.cmd = BlenderRenderCommand(
             worker=self.fworker,
@@ -22,9 +38,16 @@ class BlenderRenderTest(AbstractCommandTest):
             command_idx=0,
         )
 
+        self.mock_cse = CoroMock(...)
+        self.mock_cse.coro.return_value.wait = CoroMock(return_value=0)
+        self.mock_cse.coro.return_value.pid = 47
+        patcher = patch('asyncio.create_subprocess_exec', new=self.mock_cse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_re_time(self):
         line = '| Time:00:04.17 |'
-        m = self.cmd.re_time.search(line)
+        m = self.cmd_ro.re_time.search(line)
 
         self.assertEqual(m.groupdict(), {
             'hours': None,
@@ -37,7 +60,7 @@ class BlenderRenderTest(AbstractCommandTest):
         line = 'Fra:10 Mem:17.52M (0.00M, Peak 33.47M) | Time:00:04.17 | Remaining:00:00.87 | ' \
                'Mem:1.42M, Peak:1.42M | Scene, RenderLayer | Path Tracing Tile 110/135'
         self.assertEqual(
-            self.cmd.parse_render_line(line),
+            self.cmd_ro.parse_render_line(line),
             {'fra': 10,
              'mem': '17.52M',
              'peakmem': '33.47M',
@@ -50,7 +73,7 @@ class BlenderRenderTest(AbstractCommandTest):
         line = 'Fra:003 Mem:17.52G (0.00M, Peak 33G) | Time:03:00:04.17 | Remaining:44:00:00.87 | ' \
                'Mem:1.42M, Peak:1.42M | Séance, RenderLëør | Computing cosmic flöw 110/13005'
         self.assertEqual(
-            self.cmd.parse_render_line(line),
+            self.cmd_ro.parse_render_line(line),
             {'fra': 3,
              'mem': '17.52G',
              'peakmem': '33G',
@@ -76,9 +99,8 @@ class BlenderRenderTest(AbstractCommandTest):
 
     def test_cli_args(self):
         """Test that CLI arguments in the blender_cmd setting are handled properly."""
-        from tests.mock_responses import CoroMock
 
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -88,32 +110,26 @@ class BlenderRenderTest(AbstractCommandTest):
             'filepath': filepath,
         }
 
-        cse = CoroMock(...)
-        cse.coro.return_value.wait = CoroMock(return_value=0)
-        cse.coro.return_value.pid = 47
-        with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
-            self.loop.run_until_complete(self.cmd.run(settings))
-
-            mock_cse.assert_called_once_with(
-                self.thisfile,
-                '--with',
-                '--cli=args for CLI',
-                '--enable-autoexec',
-                '-noaudio',
-                '--background',
-                filepath,
-                '--render-format', 'JPEG',
-                '--render-frame', '1..2',
-                stdin=subprocess.DEVNULL,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                env=mock.ANY,
-            )
+        self.loop.run_until_complete(self.cmd.run(settings))
+
+        self.mock_cse.assert_called_once_with(
+            self.thisfile,
+            '--with',
+            '--cli=args for CLI',
+            '--enable-autoexec',
+            '-noaudio',
+            '--background',
+            filepath,
+            '--render-format', 'JPEG',
+            '--render-frame', '1..2',
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=mock.ANY,
+        )
 
     def test_cli_openexr(self):
-        from tests.mock_responses import CoroMock
-
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -123,32 +139,26 @@ class BlenderRenderTest(AbstractCommandTest):
             'filepath': filepath,
         }
 
-        cse = CoroMock(...)
-        cse.coro.return_value.wait = CoroMock(return_value=0)
-        cse.coro.return_value.pid = 47
-        with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
-            self.loop.run_until_complete(self.cmd.run(settings))
-
-            mock_cse.assert_called_once_with(
-                self.thisfile,
-                '--with',
-                '--cli=args for CLI',
-                '--enable-autoexec',
-                '-noaudio',
-                '--background',
-                filepath,
-                '--render-format', 'EXR',  # see https://developer.blender.org/D4502
-                '--render-frame', '1..2',
-                stdin=subprocess.DEVNULL,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                env=mock.ANY,
-            )
+        self.loop.run_until_complete(self.cmd.run(settings))
+
+        self.mock_cse.assert_called_once_with(
+            self.thisfile,
+            '--with',
+            '--cli=args for CLI',
+            '--enable-autoexec',
+            '-noaudio',
+            '--background',
+            filepath,
+            '--render-format', 'EXR',  # see https://developer.blender.org/D4502
+            '--render-frame', '1..2',
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=mock.ANY,
+        )
 
     def test_python_expr(self):
-        from tests.mock_responses import CoroMock
-
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -159,32 +169,27 @@ class BlenderRenderTest(AbstractCommandTest):
             'filepath': filepath,
         }
 
-        cse = CoroMock(...)
-        cse.coro.return_value.wait = CoroMock(return_value=0)
-        cse.coro.return_value.pid = 47
-        with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
-            self.loop.run_until_complete(self.cmd.run(settings))
-
-            mock_cse.assert_called_once_with(
-                self.thisfile,
-                '--with',
-                '--cli=args for CLI',
-                '--enable-autoexec',
-                '-noaudio',
-                '--background',
-                filepath,
-                '--python-expr', 'print("yay in \'quotes\'")',
-                '--render-format', 'JPEG',
-                '--render-frame', '1..2',
-                stdin=subprocess.DEVNULL,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                env=mock.ANY,
-            )
+        self.loop.run_until_complete(self.cmd.run(settings))
+
+        self.mock_cse.assert_called_once_with(
+            self.thisfile,
+            '--with',
+            '--cli=args for CLI',
+            '--enable-autoexec',
+            '-noaudio',
+            '--background',
+            filepath,
+            '--python-expr', 'print("yay in \'quotes\'")',
+            '--render-format', 'JPEG',
+            '--render-frame', '1..2',
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=mock.ANY,
+        )
 
     def test_cli_args_override_file(self):
         """Test that an override file next to the blend file is recognised."""
-        from tests.mock_responses import CoroMock
 
         with tempfile.TemporaryDirectory() as tempdir:
             temppath = Path(tempdir)
@@ -203,33 +208,28 @@ class BlenderRenderTest(AbstractCommandTest):
                 'filepath': blendpath.as_posix(),
             }
 
-            cse = CoroMock(...)
-            cse.coro.return_value.wait = CoroMock(return_value=0)
-            cse.coro.return_value.pid = 47
-            with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
-                self.loop.run_until_complete(self.cmd.run(settings))
-
-                mock_cse.assert_called_once_with(
-                    self.thisfile,
-                    '--enable-autoexec',
-                    '-noaudio',
-                    '--background',
-                    blendpath.as_posix(),
-                    '--python-exit-code', '42',
-                    '--python', override.as_posix(),
-                    '--render-format', 'JPEG',
-                    '--render-frame', '1..2',
-                    stdin=subprocess.DEVNULL,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    env=mock.ANY,
-                )
+            self.loop.run_until_complete(self.cmd.run(settings))
+
+            self.mock_cse.assert_called_once_with(
+                self.thisfile,
+                '--enable-autoexec',
+                '-noaudio',
+                '--background',
+                blendpath.as_posix(),
+                '--python-exit-code', '42',
+                '--python', override.as_posix(),
+                '--render-format', 'JPEG',
+                '--render-frame', '1..2',
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=mock.ANY,
+            )
 
     def test_cli_environment(self):
         """Test that LD_LIBRARY_PATH is removed from the environment."""
-        from tests.mock_responses import CoroMock
 
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -239,20 +239,15 @@ class BlenderRenderTest(AbstractCommandTest):
             'filepath': filepath,
         }
 
-        cse = CoroMock(...)
-        cse.coro.return_value.wait = CoroMock(return_value=0)
-        cse.coro.return_value.pid = 47
-
         mock_env = {
             'PATH': '/path/a:/path/b',
             'LD_LIBRARY_PATH': '/path/to/conflicting/libraries',
         }
 
-        with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse, \
-                patch('os.environ', new=mock_env):
+        with patch('os.environ', new=mock_env):
             self.loop.run_until_complete(self.cmd.run(settings))
 
-            mock_cse.assert_called_once_with(
+            self.mock_cse.assert_called_once_with(
                 self.thisfile,
                 '--with',
                 '--cli=args for CLI',
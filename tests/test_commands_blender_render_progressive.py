@@ -10,6 +10,7 @@ from tests.test_runner import AbstractCommandTest
 
 class BlenderRenderProgressiveTest(AbstractCommandTest):
     thisfile = Path(__file__).as_posix()
+    thisdir = Path(__file__).parent.as_posix()
 
     def setUp(self):
         super().setUp()
@@ -33,7 +34,7 @@ class BlenderRenderProgressiveTest(AbstractCommandTest):
         """Test that CLI arguments in the blender_cmd setting are handled properly."""
         from tests.mock_responses import CoroMock
 
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -6,16 +6,26 @@ import shlex
 import subprocess
 import sys
 import tempfile
+import unittest
+from unittest import mock
+from unittest.mock import patch
+
+import pytest
 
 from tests.test_runner import AbstractCommandTest
 
 log = logging.getLogger(__name__)
+executable = Path(sys.executable).absolute().as_posix()
 frame_dir = Path(__file__).with_name('test_frames')
 
+# Looked up once, instead of searching $PATH in every test that needs them.
+_FFMPEG = shutil.which('ffmpeg')
+_FFPROBE = shutil.which('ffprobe')
+
 
 class ConcatVideosTest(AbstractCommandTest):
     settings: typing.Dict[str, typing.Any] = {
-        'ffmpeg_cmd': f'{Path(sys.executable).absolute().as_posix()!r} -hide_banner',
+        'ffmpeg_cmd': f'{executable!r} -hide_banner',
         'input_files': str(frame_dir / 'chunk-*.mkv'),
         'output_file': '/tmp/merged.mkv',
     }
@@ -30,40 +40,86 @@ class ConcatVideosTest(AbstractCommandTest):
             task_id='12345',
             command_idx=0,
         )
-        self.settings = self.settings.copy()
+
+        # The command writes its index file next to the input files, so use a
+        # directory of our own to allow running tests in parallel.
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.temppath = Path(self._tempdir.name)
+        for chunk in frame_dir.glob('chunk-*.mkv'):
+            (self.temppath / chunk.name).touch()
+
+        self.settings = {
+            **self.settings,
+            'input_files': str(self.temppath / 'chunk-*.mkv'),
+            'output_file': (self.temppath / 'merged.mkv').as_posix(),
+        }
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+        super().tearDown()
 
     def test_build_ffmpeg_cmd(self):
         self.cmd.validate(self.settings)
         cliargs = self.cmd._build_ffmpeg_command(self.settings)
 
         self.assertEqual([
-            Path(sys.executable).as_posix(), '-hide_banner',
+            executable, '-hide_banner',
             '-f', 'concat',
-            '-i', (frame_dir / 'ffmpeg-input.txt').as_posix(),
+            '-i', (self.temppath / 'ffmpeg-input.txt').as_posix(),
             '-c', 'copy',
             '-y',
-            '/tmp/merged.mkv',
+            (self.temppath / 'merged.mkv').as_posix(),
         ], cliargs)
 
     def test_run_ffmpeg(self):
-        with tempfile.TemporaryDirectory() as tempdir:
-            outfile = Path(tempdir) / 'merged.mkv'
-            settings: typing.Dict[str, typing.Any] = {
-                **self.settings,
-                'ffmpeg_cmd': 'ffmpeg',  # use the real FFmpeg for this test.
-                'output_file': outfile.as_posix(),
-            }
-
-            self.loop.run_until_complete(self.cmd.run(settings))
-            self.assertTrue(outfile.exists())
-
-            ffprobe_cmd = [shutil.which('ffprobe'), '-v', 'error',
-                           '-show_entries', 'format=duration',
-                           '-of', 'default=noprint_wrappers=1:nokey=1',
-                           outfile.as_posix()]
+        from tests.mock_responses import CoroMock
+
+        index_file = self.temppath / 'ffmpeg-input.txt'
+        cse = CoroMock(...)
+        cse.coro.return_value.wait = CoroMock(return_value=0)
+        cse.coro.return_value.pid = 47
+        with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
+            ok = self.loop.run_until_complete(self.cmd.run(self.settings))
+
+        self.assertTrue(ok)
+        mock_cse.assert_called_once_with(
+            executable, '-hide_banner',
+            '-f', 'concat',
+            '-i', index_file.as_posix(),
+            '-c', 'copy',
+            '-y',
+            (self.temppath / 'merged.mkv').as_posix(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=mock.ANY,
+        )
+        # The index file should have been cleaned up after running FFmpeg.
+        self.assertFalse(index_file.exists())
+
+    @pytest.mark.integration
+    @unittest.skipUnless(_FFMPEG and _FFPROBE, 'FFmpeg and ffprobe are not installed')
+    def test_run_real_ffmpeg(self):
+        for chunk in frame_dir.glob('chunk-*.mkv'):
+            shutil.copy(chunk, self.temppath / chunk.name)
+
+        outfile = self.temppath / 'merged.mkv'
+        settings: typing.Dict[str, typing.Any] = {
+            **self.settings,
+            'ffmpeg_cmd': 'ffmpeg',  # use the real FFmpeg for this test.
+        }
+
+        self.loop.run_until_complete(self.cmd.run(settings))
+        self.assertTrue(outfile.exists())
+
+        ffprobe_cmd = [_FFPROBE, '-v', 'error',
+                       '-show_entries', 'format=duration',
+                       '-of', 'default=noprint_wrappers=1:nokey=1',
+                       outfile.as_posix()]
+        if log.isEnabledFor(logging.DEBUG):
             log.debug('Running %s', ' '.join(shlex.quote(arg) for arg in ffprobe_cmd))
-            probe_out = subprocess.check_output(ffprobe_cmd)
-            probed_duration = float(probe_out)
+        probe_out = subprocess.check_output(ffprobe_cmd, stdin=subprocess.DEVNULL)
+        probed_duration = float(probe_out)
 
-            # The combined videos are 7 frames @ 24 frames per second.
-            self.assertAlmostEqual(0.291, probed_duration, places=3)
+        # The combined videos are 7 frames @ 24 frames per second.
+        self.assertAlmostEqual(0.291, probed_duration, places=3)
@@ -1,18 +1,13 @@
-from pathlib import Path
 import os
 
-from tests.test_runner import AbstractCommandTest
+from tests.test_runner import AbstractTempDirCommandTest
 
 
-class CopyFileTest(AbstractCommandTest):
+class CopyFileTest(AbstractTempDirCommandTest):
     def setUp(self):
         super().setUp()
 
         from flamenco_worker.commands import CopyFileCommand
-        import tempfile
-
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.tmppath = Path(self.tmpdir.name)
 
         self.cmd = CopyFileCommand(
             worker=self.fworker,
@@ -20,10 +15,6 @@ class CopyFileTest(AbstractCommandTest):
             command_idx=0,
         )
 
-    def tearDown(self):
-        super().tearDown()
-        self.tmpdir.cleanup()
-
     def test_validate_settings(self):
         self.assertIn('src', self.cmd.validate({'src': 12, 'dest': '/valid/path'}))
         self.assertIn('src', self.cmd.validate({'src': '', 'dest': '/valid/path'}))
@@ -57,7 +48,7 @@ class CopyFileTest(AbstractCommandTest):
         src = self.tmppath / 'non-existing'
 
         dest = self.tmppath / 'dest'
-        with open(str(dest), 'w') as outfile:
+        with open(dest, 'w') as outfile:
             outfile.write('dest')
 
         task = self.cmd.run({'src': str(src), 'dest': str(dest)})
@@ -67,16 +58,16 @@ class CopyFileTest(AbstractCommandTest):
         self.assertFalse(src.exists())
         self.assertTrue(dest.exists())
 
-        with open(str(dest), 'r') as infile:
+        with open(dest, 'r') as infile:
             self.assertEqual('dest', infile.read())
 
     def test_existing_source_and_dest(self):
         src = self.tmppath / 'existing'
-        with open(str(src), 'w') as outfile:
+        with open(src, 'w') as outfile:
             outfile.write('src')
 
         dest = self.tmppath / 'dest'
-        with open(str(dest), 'w') as outfile:
+        with open(dest, 'w') as outfile:
             outfile.write('dest')
 
         task = self.cmd.run({'src': str(src), 'dest': str(dest)})
@@ -86,15 +77,15 @@ class CopyFileTest(AbstractCommandTest):
         self.assertTrue(src.exists())
         self.assertTrue(dest.exists())
 
-        with open(str(src), 'r') as infile:
+        with open(src, 'r') as infile:
             self.assertEqual('src', infile.read())
 
-        with open(str(dest), 'r') as infile:
+        with open(dest, 'r') as infile:
             self.assertEqual('src', infile.read())
 
     def test_dest_in_nonexisting_subdir(self):
         src = self.tmppath / 'existing'
-        with open(str(src), 'w') as outfile:
+        with open(src, 'w') as outfile:
             outfile.write('src')
 
         dest = self.tmppath / 'nonexisting' / 'subdir' / 'dest'
@@ -105,5 +96,5 @@ class CopyFileTest(AbstractCommandTest):
         self.assertTrue(src.exists())
         self.assertTrue(dest.exists())
 
-        with open(str(dest), 'r') as infile:
+        with open(dest, 'r') as infile:
             self.assertEqual('src', infile.read())
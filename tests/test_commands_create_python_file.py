@@ -1,18 +1,13 @@
-from pathlib import Path
 import os
 
-from tests.test_runner import AbstractCommandTest
+from tests.test_runner import AbstractTempDirCommandTest
 
 
-class CreatePythonFileTest(AbstractCommandTest):
+class CreatePythonFileTest(AbstractTempDirCommandTest):
     def setUp(self):
         super().setUp()
 
         from flamenco_worker.commands import CreatePythonFile
-        import tempfile
-
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.tmppath = Path(self.tmpdir.name)
 
         self.cmd = CreatePythonFile(
             worker=self.fworker,
@@ -20,10 +15,6 @@ class CreatePythonFileTest(AbstractCommandTest):
             command_idx=0,
         )
 
-    def tearDown(self):
-        super().tearDown()
-        self.tmpdir.cleanup()
-
     def test_validate_settings(self):
         self.assertIn('filepath', self.cmd.validate({'filepath': 12, 'contents': '# comment'}))
         self.assertIn('filepath', self.cmd.validate({'filepath': '', 'contents': '# comment'}))
@@ -45,7 +36,7 @@ class CreatePythonFileTest(AbstractCommandTest):
 
         self.assertTrue(ok)
         self.assertTrue(filepath.exists())
-        self.assertEqual('aapje', filepath.read_text())
+        self.assertEqual(b'aapje', filepath.read_bytes())
 
     def test_existing_path(self):
         filepath = self.tmppath / 'existing.py'
@@ -56,4 +47,4 @@ class CreatePythonFileTest(AbstractCommandTest):
 
         self.assertTrue(ok)
         self.assertTrue(filepath.exists())
-        self.assertEqual('öpje', filepath.read_text(encoding='utf8'))
+        self.assertEqual('öpje'.encode('utf8'), filepath.read_bytes())
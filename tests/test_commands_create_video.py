@@ -7,16 +7,25 @@ import shlex
 import subprocess
 import sys
 import tempfile
+import unittest
 from unittest import mock
+from unittest.mock import patch
+
+import pytest
 
 from tests.test_runner import AbstractCommandTest
 
 log = logging.getLogger(__name__)
+executable = Path(sys.executable).absolute().as_posix()
+
+# Looked up once, instead of searching $PATH in every test that needs them.
+_FFMPEG = shutil.which('ffmpeg')
+_FFPROBE = shutil.which('ffprobe')
 
 
 class CreateVideoTest(AbstractCommandTest):
     settings: typing.Dict[str, typing.Any] = {
-        'ffmpeg_cmd': f'{Path(sys.executable).absolute().as_posix()!r} -hide_banner',
+        'ffmpeg_cmd': f'{executable!r} -hide_banner',
         'input_files': '/tmp/*.png',
         'output_file': '/tmp/merged.mkv',
         'fps': 24,
@@ -46,15 +55,13 @@ class CreateVideoTest(AbstractCommandTest):
         self.assertEqual(['ffmpeg'], settings['ffmpeg_cmd'],
                          'The default setting should be stored in the dict after validation')
 
-    def test_build_ffmpeg_cmd_windows(self):
+    @mock.patch('platform.system', return_value='Windows')
+    def test_build_ffmpeg_cmd_windows(self, mock_system):
         self.cmd.validate(self.settings)
-
-        with mock.patch('platform.system') as mock_system:
-            mock_system.return_value = 'Windows'
-            cliargs = self.cmd._build_ffmpeg_command(self.settings)
+        cliargs = self.cmd._build_ffmpeg_command(self.settings)
 
         self.assertEqual([
-            Path(sys.executable).absolute().as_posix(), '-hide_banner',
+            executable, '-hide_banner',
             '-r', '24',
             '-f', 'concat',
             '-i', Path(self.settings['input_files']).absolute().with_name('ffmpeg-input.txt').as_posix(),
@@ -68,15 +75,13 @@ class CreateVideoTest(AbstractCommandTest):
             '/tmp/merged.mkv',
         ], cliargs)
 
-    def test_build_ffmpeg_cmd_linux(self):
+    @mock.patch('platform.system', return_value='Linux')
+    def test_build_ffmpeg_cmd_linux(self, mock_system):
         self.cmd.validate(self.settings)
-
-        with mock.patch('platform.system') as mock_system:
-            mock_system.return_value = 'Linux'
-            cliargs = self.cmd._build_ffmpeg_command(self.settings)
+        cliargs = self.cmd._build_ffmpeg_command(self.settings)
 
         self.assertEqual([
-            Path(sys.executable).absolute().as_posix(), '-hide_banner',
+            executable, '-hide_banner',
             '-r', '24',
             '-pattern_type', 'glob',
             '-i', '/tmp/*.png',
@@ -90,7 +95,39 @@ class CreateVideoTest(AbstractCommandTest):
             '/tmp/merged.mkv',
         ], cliargs)
 
-    def test_run_ffmpeg(self):
+    @mock.patch('platform.system', return_value='Linux')
+    def test_run_ffmpeg(self, mock_system):
+        from tests.mock_responses import CoroMock
+
+        cse = CoroMock(...)
+        cse.coro.return_value.wait = CoroMock(return_value=0)
+        cse.coro.return_value.pid = 47
+        with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
+            ok = self.loop.run_until_complete(self.cmd.run(self.settings))
+
+        self.assertTrue(ok)
+        mock_cse.assert_called_once_with(
+            executable, '-hide_banner',
+            '-r', '24',
+            '-pattern_type', 'glob',
+            '-i', '/tmp/*.png',
+            '-c:v', 'h264',
+            '-crf', '20',
+            '-g', '18',
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+            '-pix_fmt', 'yuv420p',
+            '-y',
+            '-bf', '0',
+            '/tmp/merged.mkv',
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=mock.ANY,
+        )
+
+    @pytest.mark.integration
+    @unittest.skipUnless(_FFMPEG and _FFPROBE, 'FFmpeg and ffprobe are not installed')
+    def test_run_real_ffmpeg(self):
         with tempfile.TemporaryDirectory() as tempdir:
             outfile = Path(tempdir) / 'merged.mkv'
             frame_dir = Path(__file__).with_name('test_frames')
@@ -104,12 +141,13 @@ class CreateVideoTest(AbstractCommandTest):
             self.loop.run_until_complete(self.cmd.run(settings))
             self.assertTrue(outfile.exists())
 
-            ffprobe_cmd = [shutil.which('ffprobe'), '-v', 'error',
+            ffprobe_cmd = [_FFPROBE, '-v', 'error',
                            '-show_entries', 'format=duration',
                            '-of', 'default=noprint_wrappers=1:nokey=1',
                            outfile.as_posix()]
-            log.debug('Running %s', ' '.join(shlex.quote(arg) for arg in ffprobe_cmd))
-            probe_out = subprocess.check_output(ffprobe_cmd)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug('Running %s', ' '.join(shlex.quote(arg) for arg in ffprobe_cmd))
+            probe_out = subprocess.check_output(ffprobe_cmd, stdin=subprocess.DEVNULL)
             probed_duration = float(probe_out)
             fps: int = settings['fps']
             expect_duration = len(list(frame_dir.glob('*.png'))) / fps
@@ -10,6 +10,7 @@ from tests.test_runner import AbstractCommandTest
 
 class BlenderRenderProgressiveTest(AbstractCommandTest):
     thisfile = Path(__file__).as_posix()
+    thisdir = Path(__file__).parent.as_posix()
 
     def setUp(self):
         super().setUp()
@@ -23,9 +24,9 @@ class BlenderRenderProgressiveTest(AbstractCommandTest):
         )
 
     def test_exr_glob(self):
-        from tests.mock_responses import CoroMock
+        from tests.mock_responses import CoroMock, done_future
 
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -35,7 +36,7 @@ class BlenderRenderProgressiveTest(AbstractCommandTest):
         }
 
         cse = CoroMock(...)
-        cse.coro.return_value.wait = CoroMock(return_value=0)
+        cse.coro.return_value.wait = lambda: done_future(self.loop, 0)
         cse.coro.return_value.pid = 47
         with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
             self.loop.run_until_complete(self.cmd.run(settings))
@@ -60,9 +61,9 @@ class BlenderRenderProgressiveTest(AbstractCommandTest):
             )
 
     def test_exr_directory(self):
-        from tests.mock_responses import CoroMock
+        from tests.mock_responses import CoroMock, done_future
 
-        filepath = Path(__file__).parent.as_posix()
+        filepath = self.thisdir
         settings = {
             # Point blender_cmd to this file so that we're sure it exists.
             'blender_cmd': f'{self.thisfile!r} --with --cli="args for CLI"',
@@ -72,7 +73,7 @@ class BlenderRenderProgressiveTest(AbstractCommandTest):
         }
 
         cse = CoroMock(...)
-        cse.coro.return_value.wait = CoroMock(return_value=0)
+        cse.coro.return_value.wait = lambda: done_future(self.loop, 0)
         cse.coro.return_value.pid = 47
         with patch('asyncio.create_subprocess_exec', new=cse) as mock_cse:
             self.loop.run_until_complete(self.cmd.run(settings))
@@ -1,9 +1,16 @@
 from pathlib import Path
+import shutil
+import unittest
 
 from tests.test_runner import AbstractCommandTest
 
+# Looked up once; merging EXR files requires a real Blender.
+_BLENDER = shutil.which('blender')
+
 
 class MergeProgressiveRendersCommandTest(AbstractCommandTest):
+    mypath = Path(__file__).parent
+
     def setUp(self):
         super().setUp()
 
@@ -11,7 +18,6 @@ class MergeProgressiveRendersCommandTest(AbstractCommandTest):
         import tempfile
 
         self.tmpdir = tempfile.TemporaryDirectory()
-        self.mypath = Path(__file__).parent
 
         self.cmd = MergeProgressiveRendersCommand(
             worker=self.fworker,
@@ -23,6 +29,7 @@ class MergeProgressiveRendersCommandTest(AbstractCommandTest):
         super().tearDown()
         self.tmpdir.cleanup()
 
+    @unittest.skipUnless(_BLENDER, 'Blender is not installed')
     def test_happy_flow(self):
         output = Path(self.tmpdir.name) / 'merged.exr'
 
@@ -45,6 +52,8 @@ class MergeProgressiveRendersCommandTest(AbstractCommandTest):
 
 
 class MergeProgressiveRenderSequenceCommandTest(AbstractCommandTest):
+    mypath = Path(__file__).parent
+
     def setUp(self):
         super().setUp()
 
@@ -52,7 +61,6 @@ class MergeProgressiveRenderSequenceCommandTest(AbstractCommandTest):
         import tempfile
 
         self.tmpdir = tempfile.TemporaryDirectory()
-        self.mypath = Path(__file__).parent
 
         self.cmd = MergeProgressiveRenderSequenceCommand(
             worker=self.fworker,
@@ -64,6 +72,7 @@ class MergeProgressiveRenderSequenceCommandTest(AbstractCommandTest):
         super().tearDown()
         self.tmpdir.cleanup()
 
+    @unittest.skipUnless(_BLENDER, 'Blender is not installed')
     def test_happy_flow(self):
         output = Path(self.tmpdir.name) / 'merged-samples-######.exr'
 
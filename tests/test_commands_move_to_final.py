@@ -1,18 +1,13 @@
 import os
-from pathlib import Path
 
-from tests.test_runner import AbstractCommandTest
+from tests.test_runner import AbstractTempDirCommandTest
 
 
-class MoveToFinalTest(AbstractCommandTest):
+class MoveToFinalTest(AbstractTempDirCommandTest):
     def setUp(self):
         super().setUp()
 
         from flamenco_worker.commands import MoveToFinalCommand
-        import tempfile
-
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.tmppath = Path(self.tmpdir.name)
 
         self.cmd = MoveToFinalCommand(
             worker=self.fworker,
@@ -21,10 +16,6 @@ class MoveToFinalTest(AbstractCommandTest):
         )
         self.cmd.__attrs_post_init__()
 
-    def tearDown(self):
-        super().tearDown()
-        self.tmpdir.cleanup()
-
     def test_nonexistant_source(self):
         src = self.tmppath / 'nonexistant-dir'
         dest = self.tmppath / 'dest'
@@ -83,8 +74,8 @@ class MoveToFinalTest(AbstractCommandTest):
         ok = self.loop.run_until_complete(task)
         self.assertTrue(ok)
 
-        # 'dest-{timestamp}' shouldn't exist.
-        self.assertFalse(list(self.tmppath.glob('dest-*')))
+        # 'dest-{timestamp}' shouldn't exist, and neither should the old 'src'.
+        self.assertEqual(['dest'], os.listdir(str(self.tmppath)))
 
         # old 'src' contents should exist at 'dest'
         self.assertTrue(dest.exists())
@@ -5,15 +5,14 @@ from pathlib import Path
 import shlex
 import subprocess
 import sys
-import tempfile
 
-from tests.test_runner import AbstractCommandTest
+from tests.test_runner import AbstractTempDirCommandTest
 
 log = logging.getLogger(__name__)
 frame_dir = Path(__file__).with_name('test_frames')
 
 
-class MoveWithCounterTest(AbstractCommandTest):
+class MoveWithCounterTest(AbstractTempDirCommandTest):
     def setUp(self):
         super().setUp()
 
@@ -25,37 +24,30 @@ class MoveWithCounterTest(AbstractCommandTest):
             command_idx=0,
         )
 
-        self._tempdir = tempfile.TemporaryDirectory()
-        self.temppath = Path(self._tempdir.name)
-
-        self.srcpath = (self.temppath / 'somefile.mkv')
+        self.srcpath = (self.tmppath / 'somefile.mkv')
         self.srcpath.touch()
 
-        (self.temppath / '2018_06_12_001-spring.mkv').touch()
-        (self.temppath / '2018_06_12_004-spring.mkv').touch()
-
-    def tearDown(self):
-        self._tempdir.cleanup()
-        super().tearDown()
+        (self.tmppath / '2018_06_12_001-spring.mkv').touch()
+        (self.tmppath / '2018_06_12_004-spring.mkv').touch()
 
     def test_numbers_with_holes(self):
         settings = {
             'src': str(self.srcpath),
-            'dest': str(self.temppath / '2018_06_12-spring.mkv'),
+            'dest': str(self.tmppath / '2018_06_12-spring.mkv'),
         }
         task = self.cmd.execute(settings)
         self.loop.run_until_complete(task)
 
         self.assertFalse(self.srcpath.exists())
-        self.assertTrue((self.temppath / '2018_06_12_005-spring.mkv').exists())
+        self.assertTrue((self.tmppath / '2018_06_12_005-spring.mkv').exists())
 
     def test_no_regexp_match(self):
         settings = {
             'src': str(self.srcpath),
-            'dest': str(self.temppath / 'jemoeder.mkv'),
+            'dest': str(self.tmppath / 'jemoeder.mkv'),
         }
         task = self.cmd.execute(settings)
         self.loop.run_until_complete(task)
 
         self.assertFalse(self.srcpath.exists())
-        self.assertTrue((self.temppath / 'jemoeder_001.mkv').exists())
+        self.assertTrue((self.tmppath / 'jemoeder_001.mkv').exists())
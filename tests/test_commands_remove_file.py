@@ -1,17 +1,11 @@
-from pathlib import Path
+from tests.test_runner import AbstractTempDirCommandTest
 
-from tests.test_runner import AbstractCommandTest
 
-
-class RemoveFileTest(AbstractCommandTest):
+class RemoveFileTest(AbstractTempDirCommandTest):
     def setUp(self):
         super().setUp()
 
         from flamenco_worker.commands import RemoveFileCommand
-        import tempfile
-
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.tmppath = Path(self.tmpdir.name)
 
         self.cmd = RemoveFileCommand(
             worker=self.fworker,
@@ -19,10 +13,6 @@ class RemoveFileTest(AbstractCommandTest):
             command_idx=0,
         )
 
-    def tearDown(self):
-        super().tearDown()
-        self.tmpdir.cleanup()
-
     def test_validate_settings(self):
         self.assertIn('path', self.cmd.validate({'path': 12}))
         self.assertIn('path', self.cmd.validate({'path': ''}))
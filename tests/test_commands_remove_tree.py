@@ -1,18 +1,29 @@
-from pathlib import Path
 import os
 
-from tests.test_runner import AbstractCommandTest
-
-
-class RemoveTreeTest(AbstractCommandTest):
+from tests.test_runner import AbstractTempDirCommandTest
+
+# Directory tree for test_soure_dir_with_files_and_dirs(), relative to the tree root.
+_TREE_DIRS = (
+    'subdir-a/subsub-1',
+    'subdir-a/subsub-2',
+    'subdir-a/subsub-3',
+    'subdir-b/subsub-1',
+    'subdir-c/subsub-1',
+    'subdir-c/subsub-2',
+)
+_TREE_FILES = (
+    'a.file',
+    'b.file',
+    'c.file',
+    *(f'{dirname}/{filename}' for dirname in _TREE_DIRS for filename in ('a.file', 'b.file')),
+)
+
+
+class RemoveTreeTest(AbstractTempDirCommandTest):
     def setUp(self):
         super().setUp()
 
         from flamenco_worker.commands import RemoveTreeCommand
-        import tempfile
-
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.tmppath = Path(self.tmpdir.name)
 
         self.cmd = RemoveTreeCommand(
             worker=self.fworker,
@@ -20,10 +31,6 @@ class RemoveTreeTest(AbstractCommandTest):
             command_idx=0,
         )
 
-    def tearDown(self):
-        super().tearDown()
-        self.tmpdir.cleanup()
-
     def test_validate_settings(self):
         self.assertIn('path', self.cmd.validate({'path': 12}))
         self.assertIn('path', self.cmd.validate({'path': ''}))
@@ -62,29 +69,11 @@ class RemoveTreeTest(AbstractCommandTest):
 
     def test_soure_dir_with_files_and_dirs(self):
         path = self.tmppath / 'dir'
-        path.mkdir()
-        (path / 'subdir-a' / 'subsub-1').mkdir(parents=True)
-        (path / 'subdir-a' / 'subsub-2').mkdir()
-        (path / 'subdir-a' / 'subsub-3').mkdir()
-        (path / 'subdir-b' / 'subsub-1').mkdir(parents=True)
-        (path / 'subdir-c' / 'subsub-1').mkdir(parents=True)
-        (path / 'subdir-c' / 'subsub-2').mkdir()
-        (path / 'a.file').touch()
-        (path / 'b.file').touch()
-        (path / 'c.file').touch()
-
-        (path / 'subdir-a' / 'subsub-1' / 'a.file').touch()
-        (path / 'subdir-a' / 'subsub-1' / 'b.file').touch()
-        (path / 'subdir-a' / 'subsub-2' / 'a.file').touch()
-        (path / 'subdir-a' / 'subsub-2' / 'b.file').touch()
-        (path / 'subdir-a' / 'subsub-3' / 'a.file').touch()
-        (path / 'subdir-a' / 'subsub-3' / 'b.file').touch()
-        (path / 'subdir-b' / 'subsub-1' / 'a.file').touch()
-        (path / 'subdir-b' / 'subsub-1' / 'b.file').touch()
-        (path / 'subdir-c' / 'subsub-1' / 'a.file').touch()
-        (path / 'subdir-c' / 'subsub-1' / 'b.file').touch()
-        (path / 'subdir-c' / 'subsub-2' / 'a.file').touch()
-        (path / 'subdir-c' / 'subsub-2' / 'b.file').touch()
+        root = str(path)
+        for dirname in _TREE_DIRS:
+            os.makedirs(os.path.join(root, dirname))
+        for filename in _TREE_FILES:
+            os.close(os.open(os.path.join(root, filename), os.O_CREAT | os.O_WRONLY, 0o644))
 
         task = self.cmd.run({'path': str(path)})
         ok = self.loop.run_until_complete(task)
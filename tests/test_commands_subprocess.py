@@ -13,6 +13,12 @@ from tests.test_runner import AbstractCommandTest
 
 
 class PIDFileTest(AbstractCommandTest):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.my_pid = os.getpid()
+        cls.my_process_str = str(psutil.Process(cls.my_pid))
+
     def setUp(self):
         super().setUp()
 
@@ -27,34 +33,30 @@ class PIDFileTest(AbstractCommandTest):
     def test_alive(self):
         with tempfile.TemporaryDirectory(suffix='.pid') as tmpdir:
             pidfile = Path(tmpdir) / 'pidfile.pid'
-            my_pid = os.getpid()
-            pidfile.write_text(str(my_pid))
+            pidfile.write_text(str(self.my_pid))
 
             self.cmd.worker.trunner.subprocess_pid_file = pidfile
 
             msg = self.cmd.validate({'cmd': 'echo'})
             self.assertIn(str(pidfile), msg)
-            self.assertIn(str(psutil.Process(my_pid)), msg)
+            self.assertIn(self.my_process_str, msg)
 
     def test_alive_newlines(self):
         with tempfile.TemporaryDirectory(suffix='.pid') as tmpdir:
             pidfile = Path(tmpdir) / 'pidfile.pid'
-            my_pid = os.getpid()
-            pidfile.write_text('\n%s\n' % my_pid)
+            pidfile.write_text('\n%s\n' % self.my_pid)
 
             self.cmd.worker.trunner.subprocess_pid_file = pidfile
 
             msg = self.cmd.validate({'cmd': 'echo'})
             self.assertIn(str(pidfile), msg)
-            self.assertIn(str(psutil.Process(my_pid)), msg)
+            self.assertIn(self.my_process_str, msg)
 
     def test_dead(self):
         # Find a PID that doesn't exist.
         for _ in range(1000):
             pid = random.randint(1, 2**16)
-            try:
-                psutil.Process(pid)
-            except psutil.NoSuchProcess:
+            if not psutil.pid_exists(pid):
                 break
         else:
             self.fail('Unable to find unused PID')
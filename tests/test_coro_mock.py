@@ -5,9 +5,10 @@ import unittest
 
 
 class CoroMockTest(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         from flamenco_worker.cli import construct_asyncio_loop
-        self.loop = construct_asyncio_loop()
+        cls.loop = construct_asyncio_loop()
 
     def test_setting_return_value(self):
         from tests.mock_responses import CoroMock
@@ -0,0 +1,26 @@
+import datetime
+import unittest
+
+import jwt
+
+
+class RegistrationTokenTest(unittest.TestCase):
+    def test_decodable_by_pyjwt(self):
+        from flamenco_worker import jwtauth
+
+        token = jwtauth.new_registration_token('Pre-shared sëcret')
+        self.assertIsInstance(token, str)
+
+        claims = jwt.decode(token, 'Pre-shared sëcret'.encode(), algorithms=['HS256'])
+        self.assertEqual({'exp', 'iat'}, set(claims))
+
+        lifetime = datetime.timedelta(seconds=claims['exp'] - claims['iat'])
+        self.assertAlmostEqual(jwtauth.REGISTRATION_TOKEN_EXPIRY.total_seconds(),
+                               lifetime.total_seconds(), places=3)
+
+    def test_wrong_secret(self):
+        from flamenco_worker import jwtauth
+
+        token = jwtauth.new_registration_token('the secret')
+        with self.assertRaises(jwt.InvalidSignatureError):
+            jwt.decode(token, b'another secret', algorithms=['HS256'])
@@ -58,7 +58,7 @@ class PretaskWriteCheckTest(AbstractFWorkerTest):
 
             self.assertFalse(testfile.exists(), '%s should have been deleted' % testfile)
 
-        self.manager.post.assert_called_once_with('/task', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/task')
         self.assertIsNone(self.worker.sleeping_fut)
 
     def test_happy_not_remove_file(self):
@@ -78,8 +78,9 @@ class PretaskWriteCheckTest(AbstractFWorkerTest):
             self.asyncio_loop.run_until_complete(self.worker.single_iteration_fut)
 
             self.assertTrue(testfile.exists(), '%s should not have been deleted' % testfile)
+            self.assertEqual(b'x', testfile.read_bytes(), '%s should not be modified' % testfile)
 
-        self.manager.post.assert_called_once_with('/task', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/task')
         self.assertIsNone(self.worker.sleeping_fut)
 
     @contextlib.contextmanager
@@ -99,7 +100,7 @@ class PretaskWriteCheckTest(AbstractFWorkerTest):
             if post_run is not None:
                 post_run()
 
-        self.manager.post.assert_called_once_with('/ack-status-change/error', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/ack-status-change/error')
         self.assertFalse(self.worker.sleeping_fut.done())
 
 
@@ -156,5 +157,5 @@ class PretaskReadCheckTest(AbstractFWorkerTest):
             if post_run is not None:
                 post_run()
 
-        self.manager.post.assert_called_once_with('/ack-status-change/error', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/ack-status-change/error')
         self.assertFalse(self.worker.sleeping_fut.done())
@@ -9,16 +9,38 @@ from unittest.mock import Mock, call
 from tests.abstract_worker_test import AbstractWorkerTest
 
 executable = Path(sys.executable).as_posix()
+_quoted_executable = shlex.quote(executable)
+
+
+def python_cmd(code: str) -> str:
+    """Return a shell command line that runs the code with this Python interpreter.
+
+    Uses shlex to quote the arguments, so we're sure it's done well.
+    """
+    return f'{_quoted_executable} -c {shlex.quote(code)}'
 
 
 class AbstractCommandTest(AbstractWorkerTest):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        from flamenco_worker.cli import construct_asyncio_loop
+
+        # One event loop for all tests in the class; tearDown() cleans up after each test.
+        cls.loop = construct_asyncio_loop()
+
+    @classmethod
+    def tearDownClass(cls):
+        # This is required for subprocesses, otherwise unregistering signal handlers goes wrong.
+        cls.loop.close()
+        super().tearDownClass()
+
     def setUp(self):
         from tests.mock_responses import CoroMock
         from flamenco_worker.worker import FlamencoWorker
         from flamenco_worker.runner import TaskRunner
-        from flamenco_worker.cli import construct_asyncio_loop
 
-        self.loop = construct_asyncio_loop()
         self.fworker = Mock(spec=FlamencoWorker)
         self.fworker.trunner = Mock(spec=TaskRunner)
         self.fworker.trunner.subprocess_pid_file = None
@@ -28,8 +50,36 @@ class AbstractCommandTest(AbstractWorkerTest):
         logging.getLogger('flamenco_worker.commands').setLevel(logging.DEBUG)
 
     def tearDown(self):
-        # This is required for subprocesses, otherwise unregistering signal handlers goes wrong.
-        self.loop.close()
+        # Don't let tasks left behind by this test run in the next one.
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+
+class AbstractTempDirCommandTest(AbstractCommandTest):
+    """Command test that gives every test its own empty directory in self.tmppath."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        import tempfile
+
+        # One temporary directory for the entire class; every test gets its own subdirectory.
+        cls.tmpdir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+
+        self.tmppath = Path(self.tmpdir.name) / self._testMethodName
+        self.tmppath.mkdir()
 
 
 class SleepCommandTest(AbstractCommandTest):
@@ -43,16 +93,42 @@ class SleepCommandTest(AbstractCommandTest):
             command_idx=0,
         )
 
-        time_before = time.time()
+        time_before = time.monotonic()
         ok = self.loop.run_until_complete(asyncio.wait_for(
-            cmd.run({'time_in_seconds': 0.5}),
-            0.6  # the 'sleep' should be over in not more than 0.1 seconds extra
+            cmd.run({'time_in_seconds': 0.1}),
+            0.2  # the 'sleep' should be over in not more than 0.1 seconds extra
         ))
-        duration = time.time() - time_before
-        self.assertGreaterEqual(duration, 0.5)
+        duration = time.monotonic() - time_before
+        self.assertGreaterEqual(duration, 0.1)
         self.assertTrue(ok)
 
 
+class QueuedLogTest(AbstractCommandTest):
+    def test_queued_lines_before_error(self):
+        from flamenco_worker.commands import CommandExecutionError, SleepCommand
+
+        cmd = SleepCommand(
+            worker=self.fworker,
+            task_id='12345',
+            command_idx=0,
+        )
+
+        async def execute(settings):
+            cmd.queue_log('Moving %s to %s', 'a.exr', 'b.exr')
+            raise CommandExecutionError('merge failed')
+        cmd.execute = execute
+
+        ok = self.loop.run_until_complete(cmd.run({'time_in_seconds': 0}))
+        self.assertFalse(ok)
+
+        # The queued line should be logged before the error, not after it.
+        self.fworker.register_log.assert_has_calls([
+            call('sleep: Starting'),
+            call('Moving a.exr to b.exr'),
+            call(f'{cmd.identifier}: Error executing: merge failed'),
+        ])
+
+
 class ExecCommandTest(AbstractCommandTest):
     def construct(self):
         from flamenco_worker.commands import ExecCommand
@@ -82,10 +158,8 @@ class ExecCommandTest(AbstractCommandTest):
     def test_exec_python(self):
         cmd = self.construct()
 
-        # Use shlex to quote strings like this, so we're sure it's done well.
-        args = [executable, '-c', r'print("hello, this is two lines\nYes, really.")']
         settings = {
-            'cmd': ' '.join(shlex.quote(s) for s in args)
+            'cmd': python_cmd(r'print("hello, this is two lines\nYes, really.")')
         }
 
         ok = self.loop.run_until_complete(asyncio.wait_for(
@@ -116,11 +190,9 @@ class ExecCommandTest(AbstractCommandTest):
     def test_exec_invalid_utf(self):
         cmd = self.construct()
 
-        # Use shlex to quote strings like this, so we're sure it's done well.
         # Writes an invalid sequence of continuation bytes.
-        args = [executable, '-c', r'import sys; sys.stdout.buffer.write(bytes((0x80, 0x80, 0x80)))']
         settings = {
-            'cmd': ' '.join(shlex.quote(s) for s in args)
+            'cmd': python_cmd(r'import sys; sys.stdout.buffer.write(bytes((0x80, 0x80, 0x80)))')
         }
 
         ok = self.loop.run_until_complete(asyncio.wait_for(
@@ -139,19 +211,24 @@ class ExecCommandTest(AbstractCommandTest):
             call(f'exec: Executing {executable} '
                  f'-c \'import sys; sys.stdout.buffer.write(bytes((0x80, 0x80, 0x80)))\''),
             call(f'exec: TERMinating subprocess pid={pid}'),
-            call(decode_err),
         ])
 
+        # When the process is still around, abort() waits for it and logs how it stopped.
+        # Whether that happens depends on timing, so that line is optional.
+        logged = [args[0] for args, _ in self.fworker.register_log.call_args_list]
+        next_idx = logged.index(f'exec: TERMinating subprocess pid={pid}') + 1
+        if logged[next_idx].startswith(f'exec: Process pid={pid} '):
+            next_idx += 1
+        self.assertEqual(decode_err, logged[next_idx])
+
         # The update should NOT contain a new task status -- that is left to the Worker.
         self.fworker.register_task_update.assert_called_with(activity=decode_err)
 
     def test_exec_python_fails(self):
         cmd = self.construct()
 
-        # Use shlex to quote strings like this, so we're sure it's done well.
-        args = [executable, '-c', r'raise SystemExit("FAIL")']
         settings = {
-            'cmd': ' '.join(shlex.quote(s) for s in args)
+            'cmd': python_cmd(r'raise SystemExit("FAIL")')
         }
 
         ok = self.loop.run_until_complete(asyncio.wait_for(
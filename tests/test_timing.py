@@ -1,4 +1,3 @@
-from collections import OrderedDict
 import json
 import unittest
 from unittest import mock
@@ -7,10 +6,11 @@ from flamenco_worker import timing, json_encoder
 
 
 class TimingTest(unittest.TestCase):
-    @mock.patch('time.monotonic')
-    def test_record_duration(self, mock_monotonic):
-        epoch = 260690.552905407
-        mock_monotonic.side_effect = [epoch, epoch + 3.125, epoch + 10, epoch + 11.5]
+    @mock.patch('time.monotonic_ns')
+    def test_record_duration(self, mock_monotonic_ns):
+        epoch = 260690552905407
+        mock_monotonic_ns.side_effect = [epoch, epoch + 3_125_000_000,
+                                         epoch + 10_000_000_000, epoch + 11_500_000_000]
 
         t = timing.Timing()
         with t.record_duration('testing'):
@@ -18,15 +18,15 @@ class TimingTest(unittest.TestCase):
         with t.record_duration('global warming'):
             pass
 
-        self.assertEqual(OrderedDict([
+        self.assertEqual([
             ('testing', 3.125),
             ('global warming', 1.5),
-        ]), t.events)
+        ], list(t.events.items()))
 
-    @mock.patch('time.monotonic')
-    def test_record_duration_exception(self, mock_monotonic):
-        epoch = 260690.552905407
-        mock_monotonic.side_effect = [epoch, epoch + 3.125]
+    @mock.patch('time.monotonic_ns')
+    def test_record_duration_exception(self, mock_monotonic_ns):
+        epoch = 260690552905407
+        mock_monotonic_ns.side_effect = [epoch, epoch + 3_125_000_000]
 
         t = timing.Timing()
 
@@ -34,14 +34,15 @@ class TimingTest(unittest.TestCase):
             with t.record_duration('testing'):
                 raise ValueError('just testing here')
 
-        self.assertEqual(OrderedDict([
+        self.assertEqual([
             ('testing', 3.125),
-        ]), t.events)
+        ], list(t.events.items()))
 
-    @mock.patch('time.monotonic')
-    def test_checkpoints(self, mock_monotonic):
-        epoch = 260690.552905407
-        mock_monotonic.side_effect = [epoch, epoch + 3.125, epoch + 4.75, epoch + 5, epoch + 5.5]
+    @mock.patch('time.monotonic_ns')
+    def test_checkpoints(self, mock_monotonic_ns):
+        epoch = 260690552905407
+        mock_monotonic_ns.side_effect = [epoch, epoch + 3_125_000_000, epoch + 4_750_000_000,
+                                         epoch + 5_000_000_000, epoch + 5_500_000_000]
 
         t = timing.Timing()
         t.checkpoint('starting')
@@ -50,11 +51,24 @@ class TimingTest(unittest.TestCase):
         t.checkpoint('oh and another thing')
         t.checkpoint('')
 
-        self.assertEqual(OrderedDict([
+        self.assertEqual([
             ('starting', 3.125),
             ('finishing', 1.625),
             ('oh and another thing', 0.5),
-        ]), t.events)
+        ], list(t.events.items()))
+
+    def test_duplicate_name(self):
+        t = timing.Timing()
+        with t.record_duration('testing'):
+            pass
+
+        with self.assertRaises(ValueError):
+            with t.record_duration('testing'):
+                pass
+
+        t.checkpoint('testing')
+        with self.assertRaises(ValueError):
+            t.checkpoint('')
 
     def test_add_empty(self):
         t1 = timing.Timing()
@@ -63,17 +77,17 @@ class TimingTest(unittest.TestCase):
 
         self.assertIsNot(t1, tsum)
         self.assertIsNot(t2, tsum)
-        self.assertEqual(OrderedDict(), tsum.events)
+        self.assertEqual({}, tsum.events)
 
     def test_add(self):
-        t1 = timing.Timing(OrderedDict([
-            ('starting', 3.125),
-            ('finishing', 1.625),
-        ]))
-        t2 = timing.Timing(OrderedDict([
-            ('starting', 3),
-            ('oh and another thing', 0.5),
-        ]))
+        t1 = timing.Timing({
+            'starting': 3.125,
+            'finishing': 1.625,
+        })
+        t2 = timing.Timing({
+            'starting': 3,
+            'oh and another thing': 0.5,
+        })
         t1_events_copy = t1.events.copy()
         t2_events_copy = t2.events.copy()
 
@@ -86,21 +100,21 @@ class TimingTest(unittest.TestCase):
         self.assertEqual(t1.events, t1_events_copy)
         self.assertEqual(t2.events, t2_events_copy)
 
-        self.assertEqual(OrderedDict([
+        self.assertEqual([
             ('starting', 6.125),
             ('finishing', 1.625),
             ('oh and another thing', 0.5),
-        ]), tsum.events)
+        ], list(tsum.events.items()))
 
     def test_iadd(self):
-        t1 = timing.Timing(OrderedDict([
-            ('starting', 3.125),
-            ('finishing', 1.625),
-        ]))
-        t2 = timing.Timing(OrderedDict([
-            ('starting', 3),
-            ('oh and another thing', 0.5),
-        ]))
+        t1 = timing.Timing({
+            'starting': 3.125,
+            'finishing': 1.625,
+        })
+        t2 = timing.Timing({
+            'starting': 3,
+            'oh and another thing': 0.5,
+        })
         t1_events_before = t1.events
         t2_events_copy = t2.events.copy()
         t1 += t2
@@ -109,11 +123,11 @@ class TimingTest(unittest.TestCase):
         self.assertIs(t1.events, t1_events_before)
         self.assertEqual(t2.events, t2_events_copy)
 
-        self.assertEqual(OrderedDict([
+        self.assertEqual([
             ('starting', 6.125),
             ('finishing', 1.625),
             ('oh and another thing', 0.5),
-        ]), t1.events)
+        ], list(t1.events.items()))
 
     def test_add_bad_type(self):
         with self.assertRaises(TypeError):
@@ -122,25 +136,25 @@ class TimingTest(unittest.TestCase):
             3 + timing.Timing()
 
     def test_clear(self):
-        t1 = timing.Timing(OrderedDict([
-            ('starting', 3.125),
-            ('finishing', 1.625),
-        ]))
+        t1 = timing.Timing({
+            'starting': 3.125,
+            'finishing': 1.625,
+        })
         t1_events_before = t1.events
         t1.clear()
         self.assertIs(t1_events_before, t1.events)
-        self.assertEqual(OrderedDict(), t1.events)
+        self.assertEqual({}, t1.events)
 
     def test_json_encoding(self):
-        t1 = timing.Timing(OrderedDict([
-            ('starting', 3.125),
-            ('rendering', 41.625),
-            ('finishing', 1.625),
-        ]))
+        t1 = timing.Timing({
+            'starting': 3.125,
+            'rendering': 41.625,
+            'finishing': 1.625,
+        })
 
         as_json = json.dumps(t1, cls=json_encoder.JSONEncoder)
         from_json = json.loads(as_json)
 
-        # For now we loose ordering of the timing info.
-        self.assertEqual({"starting": 3.125, "rendering": 41.625, "finishing": 1.625},
-                         from_json)
+        # Plain dicts keep their order through JSON, so the timing info does too.
+        self.assertEqual([('starting', 3.125), ('rendering', 41.625), ('finishing', 1.625)],
+                         list(from_json.items()))
@@ -56,7 +56,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         received_url = None
         received_loop = None
 
-        async def push_callback(url, *, json, loop):
+        async def push_callback(url, *, json):
             nonlocal tries
             nonlocal received_url
             nonlocal received_payload
@@ -75,7 +75,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
             # since the work loop is designed to keep running, even when exceptions are thrown.
             received_url = url
             received_payload = copy.deepcopy(json)
-            received_loop = loop
+            received_loop = asyncio.get_event_loop()
 
             return EmptyResponse()
 
@@ -87,7 +87,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         # the actual payload.
         self.asyncio_loop.run_until_complete(
             asyncio.wait_for(
-                self.tuqueue.work(loop=self.asyncio_loop),
+                self.tuqueue.work(),
                 timeout=2
             )
         )
@@ -124,7 +124,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         received_url = None
         received_loop = None
 
-        async def push_callback(url, *, json, loop):
+        async def push_callback(url, *, json):
             nonlocal received_url
             nonlocal received_payload
             nonlocal received_loop
@@ -134,7 +134,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
 
             received_url = url
             received_payload = copy.deepcopy(json)
-            received_loop = loop
+            received_loop = asyncio.get_event_loop()
             return EmptyResponse()
 
         self.manager.post.side_effect = push_callback
@@ -142,7 +142,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         # This should pick up on the pushed data.
         self.asyncio_loop.run_until_complete(
             asyncio.wait_for(
-                new_tuqueue.work(loop=self.asyncio_loop),
+                new_tuqueue.work(),
                 timeout=2
             )
         )
@@ -165,7 +165,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
 
         tries = 0
 
-        async def push_callback(url, *, json, loop):
+        async def push_callback(url, *, json):
             nonlocal tries
             tries += 1
             self.shutdown_future.cancel()
@@ -179,7 +179,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         # the actual payload.
         self.asyncio_loop.run_until_complete(
             asyncio.wait_for(
-                self.tuqueue.work(loop=self.asyncio_loop),
+                self.tuqueue.work(),
                 timeout=2
             )
         )
@@ -204,7 +204,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
 
         tries = 0
 
-        async def push_callback(url, *, json, loop):
+        async def push_callback(url, *, json):
             nonlocal tries
             tries += 1
             self.shutdown_future.cancel()
@@ -218,7 +218,7 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         # the actual payload.
         self.asyncio_loop.run_until_complete(
             asyncio.wait_for(
-                self.tuqueue.work(loop=self.asyncio_loop),
+                self.tuqueue.work(),
                 timeout=2
             )
         )
@@ -226,3 +226,27 @@ class TaskUpdateQueueTest(AbstractWorkerTest):
         # There should only be one attempt at delivering this payload.
         self.assertEqual(1, tries)
         self.assertEqual([], list(self.tuqueue._queue()))
+
+    def test_below_threshold_event(self):
+        """The below-threshold event should follow the queue size."""
+
+        from flamenco_worker.upstream_update_queue import QUEUE_SIZE_THRESHOLD
+
+        event = self.tuqueue.below_threshold_event
+        self.assertTrue(event.is_set())
+
+        for idx in range(QUEUE_SIZE_THRESHOLD):
+            self.tuqueue.queue('/push/here', {'idx': idx})
+        self.assertTrue(event.is_set())
+
+        self.tuqueue.queue('/push/here', {'idx': QUEUE_SIZE_THRESHOLD})
+        self.assertFalse(event.is_set())
+
+        rowid = next(iter(self.tuqueue._queue()))[0]
+        self.tuqueue._unqueue(rowid)
+        self.assertTrue(event.is_set())
+        self.assertEqual(QUEUE_SIZE_THRESHOLD, self.tuqueue.queue_size())
+
+        # The in-memory count should match the database after reconnecting.
+        self.tuqueue._disconnect_db()
+        self.assertEqual(QUEUE_SIZE_THRESHOLD, self.tuqueue.queue_size())
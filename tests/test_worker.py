@@ -10,16 +10,28 @@ from tests.abstract_worker_test import AbstractWorkerTest
 
 
 class AbstractFWorkerTest(AbstractWorkerTest):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
         from flamenco_worker.cli import construct_asyncio_loop
+
+        # One event loop for all tests in the class; tearDown() cleans up after each test.
+        cls.asyncio_loop = construct_asyncio_loop()
+        cls.asyncio_loop.set_debug(True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.asyncio_loop.close()
+        super().tearDownClass()
+
+    def setUp(self):
         from flamenco_worker.upstream import FlamencoManager
         from flamenco_worker.worker import FlamencoWorker
         from flamenco_worker.runner import TaskRunner
         from flamenco_worker.upstream_update_queue import TaskUpdateQueue
         from tests.mock_responses import CoroMock
 
-        self.asyncio_loop = construct_asyncio_loop()
-        self.asyncio_loop.set_debug(True)
         self.shutdown_future = self.asyncio_loop.create_future()
 
         self.manager = Mock(spec=FlamencoManager)
@@ -34,6 +46,7 @@ class AbstractFWorkerTest(AbstractWorkerTest):
 
         self.trunner.execute = self.mock_task_execute
         self.trunner.abort_current_task = CoroMock()
+        self.task_started = asyncio.Event()
 
         self.worker = FlamencoWorker(
             manager=self.manager,
@@ -52,51 +65,53 @@ class AbstractFWorkerTest(AbstractWorkerTest):
             self.worker.hostname()
 
     def tearDown(self):
-        if self.worker._push_act_to_manager is not None:
-            try:
-                self.asyncio_loop.run_until_complete(self.worker._push_act_to_manager)
-            except asyncio.CancelledError:
-                pass
-
-        if self.worker._push_log_to_manager is not None:
-            try:
-                self.asyncio_loop.run_until_complete(self.worker._push_log_to_manager)
-            except asyncio.CancelledError:
-                pass
-
         self.shutdown_future.cancel()
         self.worker.shutdown()
-        self.asyncio_loop.close()
+
+        # Don't let tasks left behind by this test run in the next one.
+        pending = asyncio.all_tasks(self.asyncio_loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.asyncio_loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
 
     async def mock_task_execute(self, task: dict, fworker):
         """Mock task execute function that does nothing but sleep a bit."""
 
-        await asyncio.sleep(1)
+        self.task_started.set()
+        # Long enough for stop_current_task() to interrupt it, see test_stop_current_task.
+        await asyncio.sleep(0.1)
         return True
 
 
 class WorkerStartupTest(AbstractFWorkerTest):
+    # Expected call to the Manager when signing on.
+    sign_on_call = call('/sign-on',
+                        json={
+                            'supported_task_types': ['sleep', 'unittest'],
+                            'nickname': 'ws-unittest',
+                        })
+
     # Mock merge_with_home_config() so that it doesn't overwrite actual config.
+    # Mock schedule_fetch_task() so that, regardless of how the event loop schedules
+    # things, no task fetch happens before we check the calls to the Manager.
+    @unittest.mock.patch('flamenco_worker.worker.FlamencoWorker.schedule_fetch_task')
     @unittest.mock.patch('flamenco_worker.config.merge_with_home_config')
-    def test_startup_already_registered(self, mock_merge_with_home_config):
+    def test_startup_already_registered(self, mock_merge_with_home_config,
+                                        mock_schedule_fetch_task):
         from tests.mock_responses import EmptyResponse, CoroMock
 
         self.manager.post = CoroMock(return_value=EmptyResponse())
 
         self.asyncio_loop.run_until_complete(self.worker.startup(may_retry_loop=False))
         mock_merge_with_home_config.assert_not_called()  # Starting with known ID/secret
-        self.manager.post.assert_called_once_with(
-            '/sign-on',
-            json={
-                'supported_task_types': ['sleep', 'unittest'],
-                'nickname': 'ws-unittest',
-            },
-            loop=self.asyncio_loop,
-        )
+        mock_schedule_fetch_task.assert_called_once_with()
+        self.assertEqual([self.sign_on_call], self.manager.post.call_args_list)
         self.tuqueue.queue.assert_not_called()
 
+    @unittest.mock.patch('flamenco_worker.worker.FlamencoWorker.schedule_fetch_task')
     @unittest.mock.patch('flamenco_worker.config.merge_with_home_config')
-    def test_startup_registration(self, mock_merge_with_home_config):
+    def test_startup_registration(self, mock_merge_with_home_config, mock_schedule_fetch_task):
         from flamenco_worker.worker import detect_platform
         from tests.mock_responses import JsonResponse, CoroMock
 
@@ -111,6 +126,7 @@ class WorkerStartupTest(AbstractFWorkerTest):
             {'worker_id': '5555',
              'worker_secret': self.worker.worker_secret}
         )
+        mock_schedule_fetch_task.assert_called_once_with()
 
         assert isinstance(self.manager.post, unittest.mock.Mock)
         self.manager.post.assert_called_once_with(
@@ -122,7 +138,6 @@ class WorkerStartupTest(AbstractFWorkerTest):
                 'nickname': 'ws-unittest',
             },
             auth=None,
-            loop=self.asyncio_loop,
         )
 
     @unittest.mock.patch('socket.gethostname')
@@ -156,7 +171,6 @@ class WorkerStartupTest(AbstractFWorkerTest):
                 'nickname': 'ws-unittest',
             },
             auth=None,
-            loop=self.asyncio_loop,
         )
 
     # Mock merge_with_home_config() so that it doesn't overwrite actual config.
@@ -189,37 +203,19 @@ class WorkerStartupTest(AbstractFWorkerTest):
         self.assertEqual(('47327', self.worker.worker_secret), self.worker.manager.auth)
 
         self.manager.post.assert_has_calls([
-            call('/sign-on',
-                 json={
-                     'supported_task_types': ['sleep', 'unittest'],
-                     'nickname': 'ws-unittest',
-                 },
-                 loop=self.asyncio_loop),
+            self.sign_on_call,
             call('/register-worker',
                  json={'secret': self.worker.worker_secret,
                        'platform': detect_platform(),
                        'supported_task_types': ['sleep', 'unittest'],
                        'nickname': 'ws-unittest'},
-                 auth=None,
-                 loop=self.asyncio_loop),
-            call('/sign-on',
-                 json={
-                     'supported_task_types': ['sleep', 'unittest'],
-                     'nickname': 'ws-unittest',
-                 },
-                 loop=self.asyncio_loop),
+                 auth=None),
+            self.sign_on_call,
         ])
         self.tuqueue.queue.assert_not_called()
 
 
 class TestWorkerTaskExecution(AbstractFWorkerTest):
-    def setUp(self):
-        super().setUp()
-        from flamenco_worker.cli import construct_asyncio_loop
-
-        self.loop = construct_asyncio_loop()
-        self.worker.loop = self.loop
-
     def test_fetch_task_happy(self):
         from unittest.mock import call
         from tests.mock_responses import JsonResponse, CoroMock
@@ -255,12 +251,12 @@ class TestWorkerTaskExecution(AbstractFWorkerTest):
         self.manager.post.assert_not_called()
 
         interesting_task = self.worker.single_iteration_fut
-        self.loop.run_until_complete(self.worker.single_iteration_fut)
+        self.asyncio_loop.run_until_complete(self.worker.single_iteration_fut)
 
         # Another fetch-task task should have been scheduled.
         self.assertNotEqual(self.worker.single_iteration_fut, interesting_task)
 
-        self.manager.post.assert_called_once_with('/task', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/task')
         self.tuqueue.queue.assert_has_calls([
             call('/tasks/58514d1e9837734f2e71b479/update',
                  {'task_progress_percentage': 0, 'activity': '',
@@ -310,17 +306,17 @@ class TestWorkerTaskExecution(AbstractFWorkerTest):
             nonlocal stop_called
             stop_called = True
 
-            await asyncio.sleep(0.2)
+            await self.task_started.wait()
             await self.worker.stop_current_task(self.worker.task_id)
 
-        asyncio.ensure_future(stop(), loop=self.loop)
-        self.loop.run_until_complete(self.worker.single_iteration_fut)
+        asyncio.ensure_future(stop(), loop=self.asyncio_loop)
+        self.asyncio_loop.run_until_complete(self.worker.single_iteration_fut)
 
         self.assertTrue(stop_called)
 
         self.manager.post.assert_has_calls([
-            unittest.mock.call('/task', loop=self.asyncio_loop),
-            unittest.mock.call(f'/tasks/{self.worker.task_id}/return', loop=self.asyncio_loop),
+            unittest.mock.call('/task'),
+            unittest.mock.call(f'/tasks/{self.worker.task_id}/return'),
         ])
         self.tuqueue.queue.assert_any_call(
             '/tasks/58514d1e9837734f2e71b479/update',
@@ -369,15 +365,15 @@ class TestWorkerTaskExecution(AbstractFWorkerTest):
             nonlocal stop_called
             stop_called = True
 
-            await asyncio.sleep(0.2)
+            await self.task_started.wait()
             await self.worker.stop_current_task('other-task-id')
 
-        asyncio.ensure_future(stop(), loop=self.loop)
-        self.loop.run_until_complete(self.worker.single_iteration_fut)
+        asyncio.ensure_future(stop(), loop=self.asyncio_loop)
+        self.asyncio_loop.run_until_complete(self.worker.single_iteration_fut)
 
         self.assertTrue(stop_called)
 
-        self.manager.post.assert_called_once_with('/task', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/task')
         self.tuqueue.queue.assert_any_call(
             '/tasks/58514d1e9837734f2e71b479/update',
             {'task_progress_percentage': 0, 'activity': '',
@@ -424,7 +420,7 @@ class TestWorkerTaskExecution(AbstractFWorkerTest):
         with unittest.mock.patch('asyncio.sleep') as mock_sleep:
             mock_sleep.side_effect = OSError('je moeder')
             with self.assertRaises(OSError):
-                self.loop.run_until_complete(self.worker.single_iteration_fut)
+                self.asyncio_loop.run_until_complete(self.worker.single_iteration_fut)
 
         # Another fetch-task task should have been scheduled.
         self.assertNotEqual(self.worker.single_iteration_fut, interesting_task)
@@ -442,11 +438,11 @@ class WorkerPushToMasterTest(AbstractFWorkerTest):
             queue_pushed_future.set_result(True)
 
         self.tuqueue.queue.side_effect = queue_pushed
-        self.worker.push_act_max_interval = timedelta(milliseconds=500)
+        # Short, but still long enough to go through the scheduled push.
+        self.worker.push_act_max_interval = timedelta(milliseconds=50)
 
-        asyncio.ensure_future(
-            self.worker.register_task_update(activity='test'),
-            loop=self.asyncio_loop)
+        self.asyncio_loop.run_until_complete(
+            self.worker.register_task_update(activity='test'))
 
         self.asyncio_loop.run_until_complete(
             asyncio.wait_for(queue_pushed_future, 1))
@@ -468,23 +464,30 @@ class WorkerPushToMasterTest(AbstractFWorkerTest):
         self.worker.push_act_max_interval = timedelta(milliseconds=500)
 
         # Non-status-changing
-        asyncio.ensure_future(
-            self.worker.register_task_update(activity='test'),
-            loop=self.asyncio_loop)
+        self.asyncio_loop.run_until_complete(
+            self.worker.register_task_update(activity='test'))
 
         # Status-changing
-        asyncio.ensure_future(
-            self.worker.register_task_update(task_status='changed'),
-            loop=self.asyncio_loop)
-
         self.asyncio_loop.run_until_complete(
-            asyncio.wait_for(queue_pushed_future, 1))
+            self.worker.register_task_update(task_status='changed'))
+
+        # The status change pushes immediately, so there is nothing to wait for.
+        self.assertTrue(queue_pushed_future.done())
 
         # Queue push should only be done once
         self.assertEqual(self.tuqueue.queue.call_count, 1)
 
-        # The scheduled task should be cancelled.
-        self.assertTrue(self.worker._push_act_to_manager.cancelled())
+        # The scheduled push should be cleared.
+        self.assertIsNone(self.worker._push_timer)
+
+    def test_unchanged_activity(self):
+        """An activity update that doesn't change anything shouldn't push."""
+
+        self.asyncio_loop.run_until_complete(
+            self.worker.register_task_update(activity='', current_command_idx=0))
+
+        self.assertIsNone(self.worker._push_timer)
+        self.tuqueue.queue.assert_not_called()
 
     def test_one_log(self):
         """A single log should be sent to manager within reasonable time."""
@@ -497,11 +500,11 @@ class WorkerPushToMasterTest(AbstractFWorkerTest):
             queue_pushed_future.set_result(True)
 
         self.tuqueue.queue.side_effect = queue_pushed
-        self.worker.push_log_max_interval = timedelta(milliseconds=500)
+        # Short, but still long enough to go through the scheduled push.
+        self.worker.push_log_max_interval = timedelta(milliseconds=50)
 
-        asyncio.ensure_future(
-            self.worker.register_log('unit tests are ünits'),
-            loop=self.asyncio_loop)
+        self.asyncio_loop.run_until_complete(
+            self.worker.register_log('unit tests are ünits'))
 
         self.asyncio_loop.run_until_complete(
             asyncio.wait_for(queue_pushed_future, 1))
@@ -521,23 +524,93 @@ class WorkerPushToMasterTest(AbstractFWorkerTest):
         self.worker.push_log_max_entries = 1  # max 1 queued, will push at 2
 
         # Queued, will schedule push
-        asyncio.ensure_future(
-            self.worker.register_log('first line'),
-            loop=self.asyncio_loop)
+        self.asyncio_loop.run_until_complete(
+            self.worker.register_log('first line'))
 
         # Max queued reached, will cause immediate push
-        asyncio.ensure_future(
-            self.worker.register_log('second line'),
-            loop=self.asyncio_loop)
-
         self.asyncio_loop.run_until_complete(
-            asyncio.wait_for(queue_pushed_future, 1))
+            self.worker.register_log('second line'))
+
+        # Reaching the maximum pushes immediately, so there is nothing to wait for.
+        self.assertTrue(queue_pushed_future.done())
 
         # Queue push should only be done once
         self.assertEqual(self.tuqueue.queue.call_count, 1)
 
-        # The scheduled task should be cancelled.
-        self.assertTrue(self.worker._push_log_to_manager.cancelled())
+        # Both lines should have been pushed together.
+        payload = self.tuqueue.queue.call_args[0][1]
+        self.assertRegex(payload['log'], r'^[^\n]+: first line\n[^\n]+: second line$')
+
+        # The scheduled push should be cleared.
+        self.assertIsNone(self.worker._push_timer)
+
+
+class WorkerWatchdogTest(AbstractFWorkerTest):
+    def test_reschedules_fetch(self):
+        """The watchdog should schedule a task fetch when an awake worker is idle."""
+
+        from flamenco_worker.worker import WorkerState
+
+        self.worker.state = WorkerState.AWAKE
+        self.worker._watchdog_tick()
+
+        self.assertIsNotNone(self.worker.single_iteration_fut)
+        self.assertIsNotNone(self.worker._watchdog_handle)
+
+    def test_leaves_asleep_worker_alone(self):
+        from flamenco_worker.worker import WorkerState
+
+        self.worker.state = WorkerState.ASLEEP
+        self.worker._watchdog_tick()
+
+        self.assertIsNone(self.worker.single_iteration_fut)
+        self.assertIsNotNone(self.worker._watchdog_handle)
+
+
+class WorkerOutputProducedTest(AbstractFWorkerTest):
+    def test_throttled_output_is_sent_later(self):
+        """Throttled outputs should all be sent once the interval has passed."""
+
+        from tests.mock_responses import EmptyResponse, CoroMock
+
+        self.manager.post = CoroMock(return_value=EmptyResponse())
+
+        self.worker.output_produced('/render/0001.png')
+        self.worker.output_produced('/render/0002.png')
+        self.worker.output_produced('/render/0003.png')
+
+        # Instead of waiting for the interval to pass, fire the timer ourselves.
+        timer = self.worker._output_produced_timer
+        self.assertIsNotNone(timer)
+        timer.cancel()
+        self.worker._send_output_produced()
+        self.asyncio_loop.run_until_complete(
+            asyncio.gather(*asyncio.all_tasks(self.asyncio_loop)))
+
+        self.manager.post.assert_has_calls([
+            call('/output-produced', json={'paths': ['/render/0001.png']}),
+            call('/output-produced', json={'paths': ['/render/0002.png', '/render/0003.png']}),
+        ])
+        self.assertEqual(2, self.manager.post.call_count)
+
+    def test_pending_output_is_sent_on_shutdown(self):
+        """Throttled outputs should be sent before signing off."""
+
+        from tests.mock_responses import EmptyResponse, CoroMock
+
+        self.manager.post = CoroMock(return_value=EmptyResponse())
+
+        self.worker.output_produced('/render/0001.png')
+        self.worker.output_produced('/render/0002.png')
+        self.assertIsNotNone(self.worker._output_produced_timer)
+
+        self.worker.shutdown()
+
+        self.manager.post.assert_has_calls([
+            call('/output-produced', json={'paths': ['/render/0001.png']}),
+            call('/output-produced', json={'paths': ['/render/0002.png']}),
+            call('/sign-off'),
+        ])
 
 
 class WorkerShutdownTest(AbstractWorkerTest):
@@ -576,20 +649,13 @@ class WorkerShutdownTest(AbstractWorkerTest):
         self.shutdown_future.cancel()
         self.worker.shutdown()
 
-        self.manager.post.assert_called_once_with('/sign-off', loop=self.asyncio_loop)
+        self.manager.post.assert_called_once_with('/sign-off')
 
     def tearDown(self):
         self.asyncio_loop.close()
 
 
 class WorkerSleepingTest(AbstractFWorkerTest):
-    def setUp(self):
-        super().setUp()
-        from flamenco_worker.cli import construct_asyncio_loop
-
-        self.loop = construct_asyncio_loop()
-        self.worker.loop = self.loop
-
     def test_stop_current_task_go_sleep(self):
         from tests.mock_responses import JsonResponse, CoroMock
 
@@ -601,7 +667,7 @@ class WorkerSleepingTest(AbstractFWorkerTest):
 
         self.worker.schedule_fetch_task()
         with self.assertRaises(concurrent.futures.CancelledError):
-            self.loop.run_until_complete(self.worker.single_iteration_fut)
+            self.asyncio_loop.run_until_complete(self.worker.single_iteration_fut)
 
         self.assertIsNotNone(self.worker.sleeping_fut)
         self.assertFalse(self.worker.sleeping_fut.done())